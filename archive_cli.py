@@ -0,0 +1,206 @@
+"""Offline archive tools.
+
+    python archive_cli.py export dump.jsonl.gz                       # from the local store and cold tier
+    python archive_cli.py export dump.jsonl.gz --discord --channel ID # from Discord (DISCORD_TOKEN)
+    python archive_cli.py import dump.jsonl.gz [--fresh]             # rebuild the local store
+
+A dump is one JSON object per line: {"id": archive message id, "location": channel/thread id,
+"record": {...}}, or "journal": [{...}, ...] for a message packing several small records. Import streams the file line by line, so memory stays bounded however big
+the dump is. It rebuilds the SQLite store and the search index; the bot rebuilds its in-memory
+indexes (per-user, ticket and staff aggregates) from the store at startup.
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import logging
+import os
+import sys
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from archive_store import ArchiveStore, ColdTier, SearchIndex, decode_archive_content, decode_record_if, dumps_compact, search_document
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+logger = logging.getLogger("archive_cli")
+
+IMPORT_BATCH = 500
+MANIFEST_ARCHIVE_TYPE = "archive_manifest"
+
+def _open_dump(path: str, mode: str) -> IO[str]:
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+def _dump_line(archive_msg_id: int, location: Optional[int], record: Union[Dict[str, Any], List[Dict[str, Any]]]) -> str:
+    key = "journal" if isinstance(record, list) else "record"
+    return dumps_compact({"id": archive_msg_id, "location": location, key: record}) + "\n"
+
+def iter_dump(path: str) -> Iterator[Tuple[int, Optional[int], Any]]:
+    """Stream (archive message id, location, record or journal records) from a dump, skipping bad lines"""
+    with _open_dump(path, "r") as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+                yield int(entry["id"]), entry.get("location"), entry["journal"] if "journal" in entry else entry["record"]
+            except Exception:
+                logger.warning(f"Skipping malformed line {line_no}")
+
+# ------------------------
+# Export
+# ------------------------
+def export_from_store(db_path: str, out_path: str, cold_dir: Optional[str] = None) -> int:
+    """Dump the hot store plus any records tiered out to the cold files"""
+    store = ArchiveStore(db_path)
+    cold = ColdTier(cold_dir) if cold_dir else None
+    written = 0
+    try:
+        # Journal lines tiered separately are merged back into their message, or import would
+        # let one copy of the message replace the other
+        cold_journal: Dict[int, List[Tuple[int, Dict[str, Any]]]] = {}
+        if cold is not None:
+            for aid, seq, record in cold.iter_entries():
+                if seq is not None:
+                    cold_journal.setdefault(aid, []).append((seq, record))
+        with _open_dump(out_path, "w") as out:
+            for aid, location, record in store.iter_all():
+                out.write(_dump_line(aid, location, record))
+                written += 1
+            for aid, location, records in store.iter_journal():
+                records = records + [r for _, r in sorted(cold_journal.pop(aid, []), key=lambda e: e[0])]
+                out.write(_dump_line(aid, location, records))
+                written += len(records)
+            if cold is not None:
+                for aid, seq, record in cold.iter_entries():
+                    # A record that was re-heated, or left hot by an interrupted move, is already out
+                    if seq is None and store.get(aid) is None:
+                        out.write(_dump_line(aid, None, record))
+                        written += 1
+                for aid, entries in sorted(cold_journal.items()):
+                    records = [r for _, r in sorted(entries, key=lambda e: e[0])]
+                    out.write(_dump_line(aid, None, records))
+                    written += len(records)
+    finally:
+        store.close()
+    return written
+
+async def export_from_discord(token: str, channel_id: int, out_path: str) -> int:
+    """Walk the archive channel and every routed thread, writing each record as it is read"""
+    import discord
+
+    intents = discord.Intents.default()
+    intents.message_content = True
+    client = discord.Client(intents=intents)
+    written = 0
+
+    async def _export():
+        nonlocal written
+        main = client.get_channel(channel_id) or await client.fetch_channel(channel_id)
+        locations = [main]
+        for m in await main.pins():
+            manifest = decode_record_if(m.content or "", (MANIFEST_ARCHIVE_TYPE,))
+            if manifest:
+                for tid in (manifest.get("routes") or {}).values():
+                    try:
+                        locations.append(client.get_channel(int(tid)) or await client.fetch_channel(int(tid)))
+                    except Exception:
+                        logger.warning(f"Archive thread {tid} not reachable")
+                break
+        with _open_dump(out_path, "w") as out:
+            for ch in locations:
+                async for m in ch.history(limit=None, oldest_first=True):
+                    record = decode_archive_content(m.content or "")
+                    if record:
+                        out.write(_dump_line(m.id, ch.id, record))
+                        written += len(record) if isinstance(record, list) else 1
+                logger.info(f"Exported {ch.id}: {written} records so far")
+
+    @client.event
+    async def on_ready():
+        try:
+            await _export()
+        except Exception:
+            logger.exception("Export from Discord failed")
+        finally:
+            await client.close()
+
+    await client.start(token)
+    return written
+
+# ------------------------
+# Import
+# ------------------------
+def import_dump(db_path: str, dump_path: str, fresh: bool = False) -> int:
+    """Rebuild the local store and search index from a dump, with no network access"""
+    store = ArchiveStore(db_path)
+    search = SearchIndex(store.conn)
+    imported = 0
+    try:
+        if fresh:
+            store.clear()
+        batch: Dict[Optional[int], list] = {}
+        pending = 0
+
+        def flush():
+            for location, items in batch.items():
+                store.upsert_many(items, location=location)
+            batch.clear()
+
+        for aid, location, record in iter_dump(dump_path):
+            if isinstance(record, list):
+                store.upsert_journal(aid, [r for r in record if isinstance(r, dict)], location=location)
+                imported += len(record)
+                continue
+            if not isinstance(record, dict) or not record.get("event_type"):
+                continue
+            batch.setdefault(location, []).append((aid, record))
+            pending += 1
+            doc = search_document(record)
+            if doc:
+                search.add(aid, *doc)
+            if pending >= IMPORT_BATCH:
+                flush()
+                imported += pending
+                pending = 0
+        flush()
+        imported += pending
+        # Anything derived from the store before the import (the bot's warm-start snapshot) is stale now
+        store.new_generation()
+    finally:
+        store.close()
+    return imported
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Export or rebuild the local moderation archive")
+    parser.add_argument("--db", default=os.environ.get("ARCHIVE_DB_PATH", "archive.db"), help="Local archive store")
+    parser.add_argument("--cold", default=os.environ.get("ARCHIVE_COLD_DIR", "archive_cold"), help="Cold tier directory")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    exp = sub.add_parser("export", help="Write the archive to a JSONL dump (.gz to compress)")
+    exp.add_argument("dump")
+    exp.add_argument("--discord", action="store_true", help="Read from Discord instead of the local store")
+    exp.add_argument("--channel", type=int, help="MOD_ARCHIVE channel id (with --discord)")
+
+    imp = sub.add_parser("import", help="Rebuild the local store and indexes from a JSONL dump")
+    imp.add_argument("dump")
+    imp.add_argument("--fresh", action="store_true", help="Clear the local store first")
+
+    args = parser.parse_args(argv)
+    if args.command == "export":
+        if args.discord:
+            token = os.environ.get("DISCORD_TOKEN")
+            if not token or not args.channel:
+                parser.error("--discord needs DISCORD_TOKEN and --channel")
+            count = asyncio.run(export_from_discord(token, args.channel, args.dump))
+        else:
+            count = export_from_store(args.db, args.dump, cold_dir=args.cold)
+        logger.info(f"Exported {count} records to {args.dump}")
+    else:
+        count = import_dump(args.db, args.dump, fresh=args.fresh)
+        logger.info(f"Imported {count} records into {args.db}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1104 @@
+import gzip
+import hashlib
+import json
+import math
+import mmap
+import os
+import re
+import shlex
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import orjson  # optional, faster encode/decode
+except ImportError:
+    orjson = None
+
+# ------------------------
+# Archive record codec
+# ------------------------
+# Version 1 (legacy, no "_v" key): indented JSON. Version 2: minified JSON.
+# Version 3: minified JSON with the short-key schema below. Readers accept all three.
+# In version 3 a field whose real name is itself a short code (or starts with the escape
+# character) is written with SHORT_KEY_ESCAPE in front, so decoding gives back the same keys.
+CODEC_VERSION_KEY = "_v"
+SHORT_KEY_ESCAPE = "~"
+CODEC_LEGACY = 1
+CODEC_COMPACT = 2
+CODEC_SHORT = 3
+DISCORD_MESSAGE_LIMIT = 2000
+# Journal messages pack many small log records into one archive message, one JSON object per line
+JOURNAL_FENCE = "```ndjson"
+TRUNCATE_MIN_KEEP = 16  # characters a trimmed field keeps at least
+
+SHORT_KEYS = {
+    "event_type": "e",
+    "user": "u",
+    "user_id": "ui",
+    "channel_id": "ch",
+    "channel_name": "cn",
+    "status": "s",
+    "timestamp": "t",
+    "created_at": "ca",
+    "closed_at": "xa",
+    "closed_by": "xb",
+    "close_reason": "xr",
+    "claimers": "cl",
+    "main_claimer": "mc",
+    "approved_closers": "ac",
+    "ticket_type": "tt",
+    "opener": "o",
+    "opener_id": "oi",
+    "opened_by": "ob",
+    "opened_by_id": "obi",
+    "inactivity_pinged_at": "ip",
+    "inactivity_warning_msg_id": "iw",
+    "code": "c",
+    "punishment": "p",
+    "reason": "r",
+    "issued_by": "ib",
+    "issued_by_id": "ibi",
+    "expires": "ex",
+    "infraction_message_id": "im",
+    "attachments": "at",
+    "extra": "x",
+    "new_rank": "nr",
+    "promoted_by": "pb",
+    "promoted_by_id": "pbi",
+    "promotion_message_id": "pm",
+    "case_number": "cnum",
+    "case_string": "cs",
+    "guild_id": "g",
+    "investigated": "iv",
+    "investigated_id": "ivi",
+    "description": "d",
+    "allowed_role_ids": "ar",
+    "allowed_member_ids": "am",
+    "started_at": "sa",
+    "duration_hours": "dh",
+    "expires_at": "ea",
+    "message_id": "mi",
+    "schema_version": "sv",
+    "closed_by_id": "xbi",
+    "timestamp_ts": "tts",
+    "created_at_ts": "cat",
+    "closed_at_ts": "xat",
+    "inactivity_pinged_at_ts": "ipt",
+    "started_at_ts": "sat",
+    "expires_at_ts": "eat",
+}
+LONG_KEYS = {v: k for k, v in SHORT_KEYS.items()}
+
+def _short_key(key: str) -> str:
+    if key in LONG_KEYS or key.startswith(SHORT_KEY_ESCAPE):
+        return SHORT_KEY_ESCAPE + key
+    return SHORT_KEYS.get(key, key)
+
+def _long_key(key: str) -> str:
+    if key.startswith(SHORT_KEY_ESCAPE):
+        return key[len(SHORT_KEY_ESCAPE):]
+    return LONG_KEYS.get(key, key)
+
+def _default(obj: Any) -> str:
+    return str(obj)
+
+def dumps_compact(details: Dict[str, Any]) -> str:
+    """Minified JSON, via orjson when it is installed"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(details, default=_default).decode("utf-8")
+        except Exception:
+            pass
+    try:
+        return json.dumps(details, default=_default, ensure_ascii=False, separators=(",", ":"))
+    except Exception:
+        return json.dumps({str(k): str(v) for k, v in details.items()}, ensure_ascii=False, separators=(",", ":"))
+
+def loads(text: str) -> Any:
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+def _shrink_longest_string(node: Any, excess: int) -> bool:
+    """Cut the longest string in a record (nested values included) by about excess characters"""
+    best: Optional[Tuple[int, Any, Any]] = None
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        for key, value in (current.items() if isinstance(current, dict) else enumerate(current)):
+            if key == CODEC_VERSION_KEY:
+                continue
+            if isinstance(value, str):
+                if best is None or len(value) > best[0]:
+                    best = (len(value), current, key)
+            elif isinstance(value, (dict, list)):
+                stack.append(value)
+    if best is None or best[0] <= TRUNCATE_MIN_KEEP:
+        return False
+    length, container, key = best
+    container[key] = container[key][: max(TRUNCATE_MIN_KEEP, length - excess - 1)] + "…"
+    return True
+
+def encode_record(details: Dict[str, Any], version: int = CODEC_COMPACT) -> str:
+    """Serialize a record into archive message content"""
+    if version == CODEC_LEGACY:
+        try:
+            body = json.dumps(details, default=_default, ensure_ascii=False, indent=2)
+        except Exception:
+            body = json.dumps({k: str(v) for k, v in details.items()}, ensure_ascii=False, indent=2)
+        return f"```json\n{body}\n```"
+    payload = {CODEC_VERSION_KEY: CODEC_COMPACT}
+    payload.update(details)
+    content = f"```json\n{dumps_compact(payload)}\n```"
+    if version == CODEC_SHORT or len(content) > DISCORD_MESSAGE_LIMIT:
+        # Short keys are the fallback for records that would not fit otherwise
+        payload = {CODEC_VERSION_KEY: CODEC_SHORT}
+        payload.update({_short_key(str(k)): v for k, v in details.items()})
+        content = f"```json\n{dumps_compact(payload)}\n```"
+    if len(content) > DISCORD_MESSAGE_LIMIT:
+        # Still too long: trim the longest text fields, or Discord rejects the write outright
+        payload = loads(dumps_compact(payload))
+        while len(content) > DISCORD_MESSAGE_LIMIT and _shrink_longest_string(payload, len(content) - DISCORD_MESSAGE_LIMIT):
+            content = f"```json\n{dumps_compact(payload)}\n```"
+    return content
+
+def decode_record(content: str) -> Optional[Dict[str, Any]]:
+    """Parse archive message content written by any codec version"""
+    if not content:
+        return None
+    inner = content.strip()
+    if inner.startswith(JOURNAL_FENCE):
+        return None  # a one-line journal would otherwise read as a record
+    if inner.startswith("```"):
+        nl = inner.find("\n")
+        inner = inner[nl + 1:] if nl != -1 else ""
+        if inner.endswith("```"):
+            inner = inner[:-3]
+    try:
+        parsed = loads(inner)
+    except Exception:
+        # Tolerate stray text around the object without a regex over the whole message
+        start, end = inner.find("{"), inner.rfind("}")
+        if start == -1 or end <= start:
+            return None
+        try:
+            parsed = loads(inner[start:end + 1])
+        except Exception:
+            return None
+    if not isinstance(parsed, dict):
+        return None
+    version = parsed.pop(CODEC_VERSION_KEY, CODEC_LEGACY)
+    if version == CODEC_SHORT:
+        parsed = {_long_key(k): v for k, v in parsed.items()}
+    return parsed
+
+# Prefilter for history walks: find the event_type without parsing the record
+_EVENT_TYPE_RE = re.compile(r'"event_type"\s*:\s*"([^"]*)"')
+_SHORT_EVENT_TYPE_RE = re.compile(r'"e":"([^"]*)"')
+_SHORT_PREFIX = '{"%s":%d,' % (CODEC_VERSION_KEY, CODEC_SHORT)
+
+def peek_event_type(content: str) -> Optional[str]:
+    """Return the event_type of an archive record, or None for anything that is not one"""
+    if not content:
+        return None
+    stripped = content.lstrip()
+    start = stripped[:1]
+    if start != "`" and start != "{" or stripped.startswith(JOURNAL_FENCE):
+        return None
+    if _SHORT_PREFIX in content:
+        m = _SHORT_EVENT_TYPE_RE.search(content)
+    else:
+        m = _EVENT_TYPE_RE.search(content)
+    return m.group(1) if m else None
+
+def decode_record_if(content: str, event_types: Optional[Iterable[str]] = None) -> Optional[Dict[str, Any]]:
+    """Decode a record only if its event_type is wanted (any type when event_types is None)"""
+    evt = peek_event_type(content)
+    if not evt or (event_types is not None and evt not in event_types):
+        return None
+    parsed = decode_record(content)
+    if not parsed or not parsed.get("event_type"):
+        return None
+    if event_types is not None and parsed.get("event_type") not in event_types:
+        return None
+    return parsed
+
+def encode_journal(records: Iterable[Dict[str, Any]]) -> str:
+    return JOURNAL_FENCE + "\n" + "\n".join(dumps_compact(r) for r in records) + "\n```"
+
+def decode_journal(content: str) -> Optional[List[Dict[str, Any]]]:
+    """Return the records packed in a journal message, or None for anything that is not one"""
+    if not content or not content.startswith(JOURNAL_FENCE):
+        return None
+    body = content[len(JOURNAL_FENCE):].strip()
+    if body.endswith("```"):
+        body = body[:-3]
+    records: List[Dict[str, Any]] = []
+    for line in body.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            parsed = loads(line)
+        except Exception:
+            continue
+        if isinstance(parsed, dict) and parsed.get("event_type"):
+            records.append(parsed)
+    return records
+
+def decode_archive_content(content: str) -> Optional[Any]:
+    """A record (dict) or journal records (list) from archive message content, else None.
+
+    Journals are checked first: every reader has to agree on what a message is.
+    """
+    packed = decode_journal(content)
+    if packed is not None:
+        return packed
+    return decode_record_if(content)
+
+# ------------------------
+# Archive query language
+# ------------------------
+# A query is a list of key=value terms, e.g. `event=infract issued_by=123 since=30d group=punishment`.
+# Comma-separated values are alternatives (status=open,closed). A numeric value matches exactly:
+# it is compared with `<field>_id` when the record has one, otherwise with the id the field holds
+# (a bare number, a mention or a trailing "(id)"), so `issued_by=<id>` finds "name (id)" entries.
+DISCORD_EPOCH_MS = 1420070400000
+QUERY_ALIASES = {"event": "event_type", "type": "ticket_type", "user": "user_id"}
+QUERY_OPTIONS = ("since", "group", "limit")
+_DURATION_RE = re.compile(r"^(\d+)([smhdw])$")
+_DURATION_SECONDS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+class QueryError(ValueError):
+    pass
+
+def snowflake_time(snowflake: int) -> float:
+    """Unix time encoded in a Discord snowflake"""
+    return ((int(snowflake) >> 22) + DISCORD_EPOCH_MS) / 1000.0
+
+def snowflake_at(ts: float) -> int:
+    """Smallest snowflake created at or after unix time ts"""
+    return max(0, int(ts * 1000) - DISCORD_EPOCH_MS) << 22
+
+def parse_duration(text: str) -> int:
+    m = _DURATION_RE.match(text.strip().lower())
+    if not m:
+        raise QueryError(f"Bad duration `{text}` (use e.g. 12h, 30d, 2w)")
+    return int(m.group(1)) * _DURATION_SECONDS[m.group(2)]
+
+def parse_query(text: str) -> Dict[str, Any]:
+    """Parse a query string into {"filters": {field: [values]}, "since", "group", "limit"}"""
+    try:
+        terms = shlex.split(text or "")
+    except ValueError as e:
+        raise QueryError(str(e))
+    spec: Dict[str, Any] = {"filters": {}, "since": None, "group": None, "limit": None}
+    for term in terms:
+        key, sep, value = term.partition("=")
+        key = key.strip().lower()
+        if not sep or not key or not value:
+            raise QueryError(f"Expected key=value, got `{term}`")
+        if key == "since":
+            spec["since"] = parse_duration(value)
+        elif key == "group":
+            spec["group"] = QUERY_ALIASES.get(value, value)
+        elif key == "limit":
+            if not value.isdigit():
+                raise QueryError("limit must be a number")
+            spec["limit"] = int(value)
+        else:
+            field = QUERY_ALIASES.get(key, key)
+            spec["filters"].setdefault(field, []).extend(v for v in value.split(",") if v)
+    return spec
+
+def _exact_id(value: Any) -> Optional[int]:
+    """The single id a value stands for: an int, a bare number, a mention or "name (id)" """
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    text = str(value).strip()
+    if text.isdigit():
+        return int(text)
+    m = _MENTION_RE.search(text) or _TRAILING_ID_RE.search(text)
+    return int(m.group(1)) if m else None
+
+def _value_matches(actual: Any, wanted: str) -> bool:
+    if isinstance(actual, (list, tuple)):
+        return any(_value_matches(a, wanted) for a in actual)
+    if actual is None:
+        return False
+    if wanted.isdigit():
+        # Numbers and snowflakes compare exactly, never as a substring of a longer id
+        return _exact_id(actual) == int(wanted)
+    return str(actual).lower() == wanted.lower()
+
+def record_matches(details: Dict[str, Any], filters: Dict[str, List[str]]) -> bool:
+    for field, wanted in filters.items():
+        if field == "user_id":
+            actual: Any = record_user_id(details)
+        else:
+            actual = details.get(field)
+            id_value = details.get(f"{field}_id")
+            # An id is answered from the integer <field>_id when the record has one
+            if actual is None or (id_value is not None and any(w.isdigit() for w in wanted)):
+                actual = id_value if id_value is not None else actual
+        if not any(_value_matches(actual, w) for w in wanted):
+            return False
+    return True
+
+def group_counts(rows: Iterable[Tuple[int, Dict[str, Any]]], field: str) -> List[Tuple[str, int]]:
+    """Count rows per value of field (day/week group by the record's snowflake time)"""
+    counts: Dict[str, int] = {}
+    for aid, details in rows:
+        if field == "day":
+            keys = [time.strftime("%Y-%m-%d", time.gmtime(snowflake_time(aid)))]
+        elif field == "week":
+            keys = [time.strftime("%G-W%V", time.gmtime(snowflake_time(aid)))]
+        else:
+            value = record_user_id(details) if field == "user_id" else details.get(field)
+            keys = [str(v) for v in value] if isinstance(value, list) else [str(value) if value not in (None, "") else "(none)"]
+        for k in keys:
+            counts[k] = counts.get(k, 0) + 1
+    return sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))
+
+# ------------------------
+# Local SQLite mirror of the MOD_ARCHIVE channel
+# ------------------------
+# The Discord archive channel stays the durable copy; this store is the fast read path.
+
+_SNOWFLAKE_RE = re.compile(r"(\d{15,21})")
+
+def _as_int(value: Any) -> Optional[int]:
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return int(value)
+    except Exception:
+        return None
+
+def record_user_id(details: Dict[str, Any]) -> Optional[int]:
+    """Return the id of the member a record is about"""
+    for key in ("user_id", "opener_id", "investigated_id"):
+        uid = _as_int(details.get(key))
+        if uid:
+            return uid
+    # Legacy / imported records only carry "name (id)" or a mention
+    m = _SNOWFLAKE_RE.search(str(details.get("user") or ""))
+    return int(m.group(1)) if m else None
+
+_MENTION_RE = re.compile(r"<@!?(\d{15,21})>")
+_TRAILING_ID_RE = re.compile(r"\((\d{15,21})\)\s*$")
+
+def actor_id(details: Dict[str, Any], key: str) -> Optional[int]:
+    """Exact member id behind an actor field such as issued_by, never a substring match"""
+    uid = _as_int(details.get(f"{key}_id"))
+    if uid:
+        return uid
+    text = str(details.get(key) or "").strip()
+    if text.isdigit() and 15 <= len(text) <= 21:
+        return int(text)
+    # Older records only carry "name (id)" or a mention
+    m = _MENTION_RE.search(text) or _TRAILING_ID_RE.search(text)
+    return int(m.group(1)) if m else None
+
+# ------------------------
+# Record schema
+# ------------------------
+# Version 2 adds integer <field>_id for every person field and epoch-second <field>_ts for
+# every timestamp field, so readers compare ints instead of parsing strings. Records without
+# schema_version are version 1.
+SCHEMA_VERSION = 2
+SCHEMA_PERSON_FIELDS = ("user", "opener", "opened_by", "issued_by", "promoted_by", "closed_by", "investigated")
+SCHEMA_TIME_FIELDS = (
+    "timestamp", "created_at", "closed_at", "inactivity_pinged_at", "started_at", "expires_at",
+    "updated_at", "last_updated", "compacted_at",
+)
+SCHEMA_ID_LIST_FIELDS = ("claimers", "approved_closers", "allowed_role_ids", "allowed_member_ids")
+
+def parse_record_time(value: Any) -> Optional[int]:
+    """Epoch seconds from "%Y-%m-%d %H:%M:%S UTC", ISO-8601 or an existing number"""
+    if value is None or value == "" or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    try:
+        dt = datetime.fromisoformat(str(value).strip().replace(" UTC", "+00:00"))
+    except Exception:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+def normalize_record(details: Dict[str, Any]) -> bool:
+    """Bring a record up to SCHEMA_VERSION in place; returns True if anything changed"""
+    before = dumps_compact(details)
+    for field in SCHEMA_PERSON_FIELDS:
+        if field not in details:
+            continue
+        # An explicit id is kept as written; writers that change a person set its id with it
+        if details.get(field) in (None, "") or details.get(f"{field}_id") is not None:
+            continue
+        uid = actor_id({field: details.get(field)}, field)
+        if uid:
+            details[f"{field}_id"] = uid
+    for field in SCHEMA_TIME_FIELDS:
+        if field in details:
+            details[f"{field}_ts"] = parse_record_time(details.get(field))
+    for field in SCHEMA_ID_LIST_FIELDS:
+        values = details.get(field)
+        if isinstance(values, list):
+            details[field] = [_as_int(v) if _as_int(v) is not None else v for v in values]
+    details["schema_version"] = SCHEMA_VERSION
+    return dumps_compact(details) != before
+
+STORE_GENERATION_KEY = "store_generation"
+
+class ArchiveStore:
+    """SQLite (WAL) store of parsed archive records keyed by archive message id"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS records (
+                archive_msg_id INTEGER PRIMARY KEY,
+                event_type TEXT,
+                user_id INTEGER,
+                channel_id INTEGER,
+                status TEXT,
+                data TEXT NOT NULL,
+                location INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS idx_records_event_type ON records(event_type);
+            CREATE INDEX IF NOT EXISTS idx_records_user ON records(event_type, user_id);
+            CREATE INDEX IF NOT EXISTS idx_records_channel ON records(event_type, channel_id);
+            CREATE INDEX IF NOT EXISTS idx_records_status ON records(event_type, status);
+            """
+        )
+        # Stores created before archive sharding have no location column
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(records)")}
+        if "location" not in columns:
+            self.conn.execute("ALTER TABLE records ADD COLUMN location INTEGER")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_records_location ON records(location)")
+        # Bumped on every write so a warm-start snapshot can replay just what changed after it
+        if "revision" not in columns:
+            self.conn.execute("ALTER TABLE records ADD COLUMN revision INTEGER NOT NULL DEFAULT 0")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_records_revision ON records(revision)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        # Records packed into journal messages: one row per record, keyed by message and line
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS journal (
+                archive_msg_id INTEGER NOT NULL,
+                seq INTEGER NOT NULL,
+                event_type TEXT,
+                user_id INTEGER,
+                data TEXT NOT NULL,
+                location INTEGER,
+                PRIMARY KEY (archive_msg_id, seq)
+            );
+            CREATE INDEX IF NOT EXISTS idx_journal_event_type ON journal(event_type, archive_msg_id);
+            CREATE INDEX IF NOT EXISTS idx_journal_location ON journal(location);
+            """
+        )
+        # Records moved to the cold tier, so one edited later can be taken back out of it
+        self.conn.execute("CREATE TABLE IF NOT EXISTS cold_records (archive_msg_id INTEGER PRIMARY KEY, event_type TEXT)")
+        self.conn.commit()
+        self._revision = self.conn.execute("SELECT COALESCE(MAX(revision), 0) FROM records").fetchone()[0]
+
+    @property
+    def generation(self) -> str:
+        """Id of the dataset in this store; changes whenever it is rebuilt, since revisions restart then"""
+        value = self.get_meta(STORE_GENERATION_KEY)
+        return value if value else self.new_generation()
+
+    def new_generation(self) -> str:
+        value = uuid.uuid4().hex
+        self.set_meta(STORE_GENERATION_KEY, value)
+        return value
+
+    def get_meta(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def meta_items(self, prefix: str) -> List[Tuple[str, str]]:
+        """(key, value) pairs whose key starts with a prefix"""
+        return self.conn.execute(
+            "SELECT key, value FROM meta WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)
+        ).fetchall()
+
+    def set_meta(self, key: str, value: Any):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    @property
+    def revision(self) -> int:
+        """Revision of the latest write; rows written later carry a higher one"""
+        return self._revision
+
+    @staticmethod
+    def _row(archive_msg_id: int, details: Dict[str, Any], location: Optional[int] = None, revision: int = 0) -> Tuple[Any, ...]:
+        data = dumps_compact(details)
+        status = details.get("status")
+        return (
+            int(archive_msg_id),
+            details.get("event_type"),
+            record_user_id(details),
+            _as_int(details.get("channel_id")),
+            str(status) if status is not None else None,
+            data,
+            location,
+            revision,
+        )
+
+    def upsert(self, archive_msg_id: int, details: Dict[str, Any], location: Optional[int] = None):
+        self.upsert_many([(archive_msg_id, details)], location=location)
+
+    def upsert_many(self, items: Iterable[Tuple[int, Dict[str, Any]]], location: Optional[int] = None):
+        """Insert or update records; location is the archive channel/thread holding them"""
+        revision = self._revision + 1
+        rows = [self._row(aid, d, location, revision) for aid, d in items if aid and isinstance(d, dict)]
+        if not rows:
+            return
+        self._revision = revision
+        with self.conn:
+            # An edit mirrored without a location keeps the one recorded when it was sent
+            self.conn.executemany(
+                "INSERT INTO records (archive_msg_id, event_type, user_id, channel_id, status, data, location, revision) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(archive_msg_id) DO UPDATE SET event_type = excluded.event_type, "
+                "user_id = excluded.user_id, channel_id = excluded.channel_id, status = excluded.status, "
+                "data = excluded.data, location = COALESCE(excluded.location, records.location), "
+                "revision = excluded.revision",
+                rows,
+            )
+
+    def delete(self, archive_msg_id: int):
+        with self.conn:
+            self.conn.execute("DELETE FROM records WHERE archive_msg_id = ?", (int(archive_msg_id),))
+            self.conn.execute("DELETE FROM journal WHERE archive_msg_id = ?", (int(archive_msg_id),))
+
+    def demote(self, event_type: str, ids: Iterable[int], max_revision: int) -> List[int]:
+        """Drop records already copied to the cold tier and mark them cold, in one transaction.
+
+        A row rewritten after max_revision stays hot; its cold copy is superseded on the next move.
+        """
+        moved: List[int] = []
+        with self.conn:
+            for aid in ids:
+                cur = self.conn.execute(
+                    "DELETE FROM records WHERE archive_msg_id = ? AND revision <= ?", (int(aid), int(max_revision))
+                )
+                if cur.rowcount:
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO cold_records (archive_msg_id, event_type) VALUES (?, ?)", (int(aid), event_type)
+                    )
+                    moved.append(int(aid))
+        return moved
+
+    def cold_event_type(self, archive_msg_id: int) -> Optional[str]:
+        """Event type of a record that was moved to the cold tier, if it was"""
+        row = self.conn.execute("SELECT event_type FROM cold_records WHERE archive_msg_id = ?", (int(archive_msg_id),)).fetchone()
+        return row[0] if row else None
+
+    def forget_cold(self, archive_msg_id: int):
+        with self.conn:
+            self.conn.execute("DELETE FROM cold_records WHERE archive_msg_id = ?", (int(archive_msg_id),))
+
+    def upsert_journal(self, archive_msg_id: int, records: List[Dict[str, Any]], location: Optional[int] = None):
+        """Store the records packed in one journal message, replacing any earlier copy"""
+        rows = [
+            (int(archive_msg_id), seq, rec.get("event_type"), record_user_id(rec), dumps_compact(rec), location)
+            for seq, rec in enumerate(records)
+        ]
+        with self.conn:
+            self.conn.execute("DELETE FROM journal WHERE archive_msg_id = ?", (int(archive_msg_id),))
+            self.conn.executemany(
+                "INSERT INTO journal (archive_msg_id, seq, event_type, user_id, data, location) VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def delete_journal_rows(self, keys: Iterable[Tuple[int, int]]):
+        with self.conn:
+            self.conn.executemany("DELETE FROM journal WHERE archive_msg_id = ? AND seq = ?", list(keys))
+
+    def query_journal(
+        self,
+        event_type: Optional[str] = None,
+        user_id: Optional[int] = None,
+        min_id: Optional[int] = None,
+        max_id: Optional[int] = None,
+    ) -> List[Tuple[int, int, Dict[str, Any]]]:
+        """Return (archive message id, line, record) for journal records, newest first"""
+        clauses = []
+        params: List[Any] = []
+        for clause, value in (
+            ("event_type = ?", event_type),
+            ("user_id = ?", user_id),
+            ("archive_msg_id >= ?", min_id),
+            ("archive_msg_id < ?", max_id),
+        ):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        sql = "SELECT archive_msg_id, seq, data FROM journal"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY archive_msg_id DESC, seq"
+        out: List[Tuple[int, int, Dict[str, Any]]] = []
+        for aid, seq, data in self.conn.execute(sql, params):
+            try:
+                out.append((aid, seq, loads(data)))
+            except Exception:
+                continue
+        return out
+
+    def iter_journal(self) -> Iterator[Tuple[int, Optional[int], List[Dict[str, Any]]]]:
+        """Stream (archive message id, location, records) per journal message, oldest first"""
+        current: Optional[Tuple[int, Optional[int], List[Dict[str, Any]]]] = None
+        for aid, location, data in self.conn.execute(
+            "SELECT archive_msg_id, location, data FROM journal ORDER BY archive_msg_id, seq"
+        ):
+            if current is None or current[0] != aid:
+                if current is not None:
+                    yield current
+                current = (aid, location, [])
+            try:
+                current[2].append(loads(data))
+            except Exception:
+                continue
+        if current is not None:
+            yield current
+
+    def get(self, archive_msg_id: int) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute("SELECT data FROM records WHERE archive_msg_id = ?", (int(archive_msg_id),)).fetchone()
+        if not row:
+            return None
+        try:
+            return loads(row[0])
+        except Exception:
+            return None
+
+    def location(self, archive_msg_id: int) -> Optional[int]:
+        """Archive channel/thread id a record was written to, if known"""
+        row = self.conn.execute("SELECT location FROM records WHERE archive_msg_id = ?", (int(archive_msg_id),)).fetchone()
+        if not row:
+            row = self.conn.execute("SELECT location FROM journal WHERE archive_msg_id = ? LIMIT 1", (int(archive_msg_id),)).fetchone()
+        return row[0] if row and row[0] else None
+
+    def head_id(self, location: Optional[int] = None, include_unset: bool = False) -> Optional[int]:
+        """Newest archive message id mirrored locally, optionally for one archive channel/thread"""
+        if location is None:
+            where, params = "", ()
+        elif include_unset:
+            # Rows mirrored before sharding carry no location and belong to the main channel
+            where, params = " WHERE location = ? OR location IS NULL", (int(location),)
+        else:
+            where, params = " WHERE location = ?", (int(location),)
+        # Journal messages count too, so a sync never re-reads them
+        row = self.conn.execute(
+            f"SELECT MAX(head) FROM (SELECT MAX(archive_msg_id) AS head FROM records{where} "
+            f"UNION ALL SELECT MAX(archive_msg_id) FROM journal{where})",
+            params * 2,
+        ).fetchone()
+        return row[0] if row and row[0] else None
+
+    def query(
+        self,
+        event_type: Optional[str] = None,
+        user_id: Optional[int] = None,
+        channel_id: Optional[int] = None,
+        status: Optional[str] = None,
+        limit: Optional[int] = None,
+        min_id: Optional[int] = None,
+        max_id: Optional[int] = None,
+    ) -> List[Tuple[int, Dict[str, Any]]]:
+        """Return (archive message id, record) pairs, newest first"""
+        clauses = []
+        params: List[Any] = []
+        if min_id is not None:
+            clauses.append("archive_msg_id >= ?")
+            params.append(int(min_id))
+        if max_id is not None:
+            clauses.append("archive_msg_id < ?")
+            params.append(int(max_id))
+        if event_type is not None:
+            clauses.append("event_type = ?")
+            params.append(event_type)
+        if user_id is not None:
+            clauses.append("user_id = ?")
+            params.append(int(user_id))
+        if channel_id is not None:
+            clauses.append("channel_id = ?")
+            params.append(int(channel_id))
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status)
+        sql = "SELECT archive_msg_id, data FROM records"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY archive_msg_id DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        out: List[Tuple[int, Dict[str, Any]]] = []
+        for aid, data in self.conn.execute(sql, params):
+            try:
+                out.append((aid, loads(data)))
+            except Exception:
+                continue
+        return out
+
+    def select(self, spec: Dict[str, Any], now: Optional[float] = None, cold: Optional["ColdTier"] = None) -> List[Tuple[int, Dict[str, Any]]]:
+        """Run a parsed query: indexed columns narrow in SQL, other fields filter in Python.
+
+        With a cold tier and a `since` window, partitions overlapping the window are read too.
+        """
+        all_filters = spec.get("filters") or {}
+        filters = dict(all_filters)
+        column_args: Dict[str, Any] = {}
+        for field, column in (("event_type", "event_type"), ("status", "status"), ("user_id", "user_id"), ("channel_id", "channel_id")):
+            values = filters.get(field)
+            if values and len(values) == 1:
+                value = values[0]
+                if column in ("user_id", "channel_id"):
+                    if not value.isdigit():
+                        continue
+                    value = int(value)
+                column_args[column] = value
+                filters.pop(field)
+        min_id = None
+        since_ts = None
+        if spec.get("since"):
+            since_ts = (now if now is not None else time.time()) - spec["since"]
+            min_id = snowflake_at(since_ts)
+        rows = self.query(min_id=min_id, **column_args)
+        if filters:
+            rows = [(aid, rec) for aid, rec in rows if record_matches(rec, filters)]
+        journal_rows = [
+            (aid, rec)
+            for aid, _, rec in self.query_journal(column_args.get("event_type"), column_args.get("user_id"), min_id=min_id)
+            if record_matches(rec, all_filters)
+        ]
+        if journal_rows:
+            rows = sorted(rows + journal_rows, key=lambda r: r[0], reverse=True)
+        if cold is not None and since_ts is not None:
+            # A journal message can hold records of several types, so the id alone is not unique
+            seen = {(aid, rec.get("event_type")) for aid, rec in rows}
+            event_types = all_filters.get("event_type")
+            cold_rows = [
+                (aid, rec)
+                for aid, rec in cold.iter_records(event_types[0] if event_types and len(event_types) == 1 else None, since_ts)
+                if (aid, rec.get("event_type")) not in seen and record_matches(rec, all_filters)
+            ]
+            if cold_rows:
+                rows = sorted(rows + cold_rows, key=lambda r: r[0], reverse=True)
+        return rows
+
+    def clear(self):
+        """Drop every mirrored record and search document (used before a full rebuild)"""
+        with self.conn:
+            self.conn.execute("DELETE FROM records")
+            self.conn.execute("DELETE FROM journal")
+            self.conn.execute("DELETE FROM cold_records")
+            for table in ("search_postings", "search_docs"):
+                if self.conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone():
+                    self.conn.execute(f"DELETE FROM {table}")
+        self.new_generation()
+
+    def iter_all(
+        self,
+        batch: int = 1000,
+        after: int = -1,
+        below_version: Optional[int] = None,
+        exclude_types: Tuple[str, ...] = (),
+    ) -> Iterable[Tuple[int, Optional[int], Dict[str, Any]]]:
+        """Stream (archive message id, location, record) oldest first without loading everything.
+
+        below_version keeps only records whose schema_version (1 when absent) is lower.
+        """
+        where = "archive_msg_id > ?"
+        extra: List[Any] = []
+        if below_version is not None:
+            where += " AND COALESCE(CAST(json_extract(data, '$.schema_version') AS INTEGER), 1) < ?"
+            extra.append(int(below_version))
+        if exclude_types:
+            where += f" AND COALESCE(event_type, '') NOT IN ({', '.join('?' for _ in exclude_types)})"
+            extra.extend(exclude_types)
+        last = after
+        while True:
+            rows = self.conn.execute(
+                f"SELECT archive_msg_id, location, data FROM records WHERE {where} ORDER BY archive_msg_id LIMIT ?",
+                (last, *extra, batch),
+            ).fetchall()
+            if not rows:
+                return
+            for aid, location, data in rows:
+                last = aid
+                try:
+                    yield aid, location, loads(data)
+                except Exception:
+                    continue
+
+    def changed_since(self, revision: int) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Stream (archive message id, record) written after a revision, oldest first"""
+        rows = self.conn.execute(
+            "SELECT archive_msg_id, data FROM records WHERE revision > ? ORDER BY archive_msg_id", (int(revision),)
+        )
+        for aid, data in rows:
+            try:
+                yield aid, loads(data)
+            except Exception:
+                continue
+
+    def ids(self) -> set:
+        """Every archive message id held in the hot store"""
+        return {row[0] for row in self.conn.execute("SELECT archive_msg_id FROM records")}
+
+    def close(self):
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+
+# ------------------------
+# Cold tier for records past their retention window
+# ------------------------
+# <root>/<event_type>/<YYYY-MM>.jsonl.gz, partitioned by the record's message time. Each
+# tiering run appends one gzip member, so partitions never need rewriting.
+class ColdTier:
+    """Compressed, month-partitioned record files read back through mmap.
+
+    Appends are not transactional with the hot store, so a partition can hold the same record
+    more than once; readers keep the last copy of each (archive message id, journal line).
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._write_lock = threading.Lock()  # tiering and re-heats rewrite partitions from worker threads
+
+    def _path(self, event_type: str, month: str) -> str:
+        return os.path.join(self.root, event_type, f"{month}.jsonl.gz")
+
+    @staticmethod
+    def _month(archive_msg_id: int) -> str:
+        return time.strftime("%Y-%m", time.gmtime(snowflake_time(archive_msg_id)))
+
+    def append(self, rows: Iterable[Tuple[int, Optional[int], Dict[str, Any]]]) -> int:
+        """Write (archive message id, journal line or None, record) rows to their partitions"""
+        grouped: Dict[Tuple[str, str], List[str]] = {}
+        for aid, seq, record in rows:
+            entry: Dict[str, Any] = {"id": aid, "record": record}
+            if seq is not None:
+                entry["seq"] = seq
+            grouped.setdefault((str(record.get("event_type")), self._month(aid)), []).append(dumps_compact(entry))
+        written = 0
+        with self._write_lock:
+            for (event_type, month), lines in grouped.items():
+                path = self._path(event_type, month)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with gzip.open(path, "ab") as f:
+                    f.write(("\n".join(lines) + "\n").encode("utf-8"))
+                written += len(lines)
+        return written
+
+    def partitions(self, event_type: Optional[str] = None, since_ts: Optional[float] = None) -> List[str]:
+        """Partition files for a type (or all types) that can hold records newer than since_ts"""
+        if not os.path.isdir(self.root):
+            return []
+        types = [event_type] if event_type else sorted(os.listdir(self.root))
+        since_month = time.strftime("%Y-%m", time.gmtime(since_ts)) if since_ts is not None else None
+        out: List[str] = []
+        for evt in types:
+            folder = os.path.join(self.root, evt)
+            if not os.path.isdir(folder):
+                continue
+            for name in sorted(os.listdir(folder)):
+                if not name.endswith(".jsonl.gz"):
+                    continue
+                if since_month and name[:7] < since_month:
+                    continue
+                out.append(os.path.join(folder, name))
+        return out
+
+    @staticmethod
+    def _read_partition(path: str) -> Dict[Tuple[int, Optional[int]], Dict[str, Any]]:
+        """(archive message id, journal line) -> record for one partition, last copy winning"""
+        entries: Dict[Tuple[int, Optional[int]], Dict[str, Any]] = {}
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return entries
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, gzip.GzipFile(fileobj=mm) as gz:
+                for line in gz:
+                    try:
+                        entry = loads(line)
+                    except Exception:
+                        continue
+                    aid = entry.get("id")
+                    if aid:
+                        key = (aid, entry.get("seq"))
+                        entries.pop(key, None)  # re-insert so the last copy keeps its place
+                        entries[key] = entry.get("record") or {}
+        return entries
+
+    def iter_entries(self, event_type: Optional[str] = None, since_ts: Optional[float] = None) -> Iterator[Tuple[int, Optional[int], Dict[str, Any]]]:
+        """Stream (archive message id, journal line or None, record), each record once"""
+        min_id = snowflake_at(since_ts) if since_ts is not None else None
+        for path in self.partitions(event_type, since_ts):
+            for (aid, seq), record in self._read_partition(path).items():
+                if min_id is not None and aid < min_id:
+                    continue
+                yield aid, seq, record
+
+    def iter_records(self, event_type: Optional[str] = None, since_ts: Optional[float] = None) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        for aid, _, record in self.iter_entries(event_type, since_ts):
+            yield aid, record
+
+    def discard(self, event_type: str, archive_msg_id: int) -> Optional[Dict[str, Any]]:
+        """Remove a record (not a journal line) from its partition; returns the copy that was there"""
+        path = self._path(event_type, self._month(archive_msg_id))
+        with self._write_lock:
+            if not os.path.exists(path):
+                return None
+            entries = self._read_partition(path)
+            removed = entries.pop((archive_msg_id, None), None)
+            if removed is None:
+                return None
+            tmp = path + ".tmp"
+            with gzip.open(tmp, "wb") as f:
+                for (aid, seq), record in entries.items():
+                    entry: Dict[str, Any] = {"id": aid, "record": record}
+                    if seq is not None:
+                        entry["seq"] = seq
+                    f.write((dumps_compact(entry) + "\n").encode("utf-8"))
+            os.replace(tmp, path)
+        return removed
+
+# ------------------------
+# Full-text search over tickets, infractions and IA cases
+# ------------------------
+# A plain inverted index (term -> document, term frequency) in the same SQLite file, ranked
+# with BM25. Documents are keyed by archive message id.
+SEARCH_STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have he her his i in is it its me my no not of on or "
+    "our she so that the their them they this to was we were what when who will with you your".split()
+)
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall((text or "").lower()) if len(t) > 1 and t not in SEARCH_STOPWORDS]
+
+def search_document(details: Dict[str, Any], transcript: str = "") -> Optional[Tuple[str, str, str, str]]:
+    """(kind, title, summary, text) to index for a record, or None if it is not searchable"""
+    evt = details.get("event_type")
+    if evt == "infract":
+        title = f"Infraction {details.get('code') or 'N/A'} — {details.get('user') or 'Unknown'}"
+        summary = f"{details.get('punishment') or ''}: {details.get('reason') or ''}"
+        fields: Tuple[str, ...] = ("user", "punishment", "reason", "issued_by", "code", "expires")
+    elif evt == "ia_case":
+        title = f"{details.get('case_string') or 'IA Case'} — {details.get('investigated') or 'Unknown'}"
+        summary = str(details.get("reason") or "")
+        fields = ("investigated", "reason", "description", "opened_by", "closed_by")
+    elif evt == "ticket":
+        title = f"Ticket {details.get('channel_name') or details.get('channel_id')} ({details.get('ticket_type') or 'other'})"
+        summary = str(details.get("close_reason") or "")
+        fields = ("opener", "opened_by", "close_reason", "closed_by", "ticket_type")
+    else:
+        return None
+    text = "\n".join(str(details.get(k) or "") for k in fields)
+    if transcript:
+        text += "\n" + transcript
+    return evt, title, summary, text
+
+class SearchIndex:
+    """Inverted index of archive documents, persisted next to the record store"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS search_docs (
+                doc_id INTEGER PRIMARY KEY,
+                kind TEXT NOT NULL,
+                title TEXT,
+                summary TEXT,
+                length INTEGER NOT NULL,
+                digest TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS search_postings (
+                term TEXT NOT NULL,
+                doc_id INTEGER NOT NULL,
+                tf INTEGER NOT NULL,
+                PRIMARY KEY (term, doc_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_search_postings_doc ON search_postings(doc_id);
+            """
+        )
+        self.conn.commit()
+
+    def add(self, doc_id: int, kind: str, title: str, summary: str, text: str) -> bool:
+        """Index (or re-index) a document; returns False when its text is unchanged"""
+        digest = hashlib.sha1(f"{kind}\0{title}\0{text}".encode("utf-8")).hexdigest()
+        row = self.conn.execute("SELECT digest FROM search_docs WHERE doc_id = ?", (int(doc_id),)).fetchone()
+        if row and row[0] == digest:
+            return False
+        terms = tokenize(f"{title}\n{text}")
+        counts: Dict[str, int] = {}
+        for t in terms:
+            counts[t] = counts.get(t, 0) + 1
+        with self.conn:
+            self.conn.execute("DELETE FROM search_postings WHERE doc_id = ?", (int(doc_id),))
+            self.conn.execute(
+                "INSERT OR REPLACE INTO search_docs (doc_id, kind, title, summary, length, digest) VALUES (?, ?, ?, ?, ?, ?)",
+                (int(doc_id), kind, title, (summary or "")[:300], len(terms), digest),
+            )
+            self.conn.executemany(
+                "INSERT INTO search_postings (term, doc_id, tf) VALUES (?, ?, ?)",
+                [(t, int(doc_id), n) for t, n in counts.items()],
+            )
+        return True
+
+    def remove(self, doc_id: int):
+        with self.conn:
+            self.conn.execute("DELETE FROM search_postings WHERE doc_id = ?", (int(doc_id),))
+            self.conn.execute("DELETE FROM search_docs WHERE doc_id = ?", (int(doc_id),))
+
+    def search(self, query: str, kind: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """Return the best matching documents, highest BM25 score first"""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        n_docs, total_len = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(length), 0) FROM search_docs").fetchone()
+        if not n_docs:
+            return []
+        avg_len = (total_len / n_docs) or 1.0
+        scores: Dict[int, float] = {}
+        lengths: Dict[int, int] = {}
+        for term in terms:
+            postings = self.conn.execute(
+                "SELECT p.doc_id, p.tf, d.length FROM search_postings p JOIN search_docs d ON d.doc_id = p.doc_id "
+                "WHERE p.term = ?" + (" AND d.kind = ?" if kind else ""),
+                (term, kind) if kind else (term,),
+            ).fetchall()
+            if not postings:
+                continue
+            idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, tf, length in postings:
+                lengths[doc_id] = length
+                norm = tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_len))
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * norm
+        best = sorted(scores.items(), key=lambda kv: (-kv[1], -kv[0]))[:limit]
+        out: List[Dict[str, Any]] = []
+        for doc_id, score in best:
+            row = self.conn.execute("SELECT kind, title, summary FROM search_docs WHERE doc_id = ?", (doc_id,)).fetchone()
+            if row:
+                out.append({"doc_id": doc_id, "kind": row[0], "title": row[1], "summary": row[2], "score": score})
+        return out
@@ -10,6 +10,18 @@ from typing import Any, Dict, Optional, List, Set
 import json
 import re
 import inspect
+import copy
+import gzip
+import io
+import bisect
+import hashlib
+from collections import OrderedDict
+
+from archive_store import (
+    DISCORD_MESSAGE_LIMIT, SCHEMA_VERSION, ArchiveStore, ColdTier, QueryError, SearchIndex, actor_id,
+    decode_archive_content, decode_journal, decode_record, decode_record_if, dumps_compact, encode_journal, encode_record,
+    group_counts, normalize_record, parse_query, record_user_id, search_document,
+)
 
 # Compatibility: Check if ButtonStyle.success exists, otherwise use primary
 SUCCESS_BUTTON_STYLE = getattr(discord.ButtonStyle, "success", discord.ButtonStyle.primary)
@@ -57,6 +69,15 @@ APPLY_CHANNEL_ID = 1371272557969281166
 
 # Mod archive (persistent storage inside Discord)
 MOD_ARCHIVE_CHANNEL_ID = 1459286015905890345
+# Local SQLite mirror of the mod archive (fast read path, Discord stays the durable copy)
+ARCHIVE_DB_PATH = os.environ.get("ARCHIVE_DB_PATH", "archive.db")
+ARCHIVE_COLD_DIR = os.environ.get("ARCHIVE_COLD_DIR", "archive_cold")
+# Checkpoint of the derived in-memory state, so a restart replays only what changed since
+ARCHIVE_SNAPSHOT_PATH = os.environ.get("ARCHIVE_SNAPSHOT_PATH", "archive_state.json.gz")
+# Append-only queue of archive writes Discord did not accept, replayed once it is reachable
+ARCHIVE_OUTBOX_PATH = os.environ.get("ARCHIVE_OUTBOX_PATH", "archive_outbox.jsonl")
+# Archive record codec: 2 = minified JSON, 3 = minified JSON with short keys (see archive_store.py)
+ARCHIVE_CODEC_VERSION = int(os.environ.get("ARCHIVE_CODEC_VERSION", "2"))
 
 # Internal Affairs related IDs
 IA_ROLE_ID = 1404679512276602881
@@ -130,7 +151,22 @@ intents.message_content = True
 intents.members = True
 intents.guilds = True
 
-bot = commands.Bot(command_prefix="!", intents=intents)
+class ArchiveBot(commands.Bot):
+    """Bot that flushes buffered archive writes before disconnecting"""
+
+    async def close(self):
+        try:
+            await flush_archive_journal()
+        except Exception:
+            logger.exception("Failed to flush the archive journal on shutdown")
+        try:
+            await flush_archive_edits()
+        except Exception:
+            logger.exception("Failed to flush archive edits on shutdown")
+        await write_archive_snapshot()
+        await super().close()
+
+bot = ArchiveBot(command_prefix="!", intents=intents)
 
 # Track bot start time
 bot.start_time = datetime.now(timezone.utc)
@@ -145,6 +181,11 @@ known_infraction_msgids: Set[int] = set()
 _scan_state_archive_id: Optional[int] = None
 _last_scan_dt: Optional[datetime] = None
 
+# Local mirror of every MOD_ARCHIVE record, keyed by archive message id
+archive_store = ArchiveStore(ARCHIVE_DB_PATH)
+search_index = SearchIndex(archive_store.conn)
+cold_tier = ColdTier(ARCHIVE_COLD_DIR)
+
 # ------------------------
 # Welcome System
 # ------------------------
@@ -422,11 +463,7 @@ class StatusView(discord.ui.View):
         await interaction.response.send_message(embed=confirm_embed, view=confirm_view, ephemeral=True)
 
 async def save_bot_status():
-    """Save bot status to archive"""
-    archive_ch = await ensure_channel(MOD_ARCHIVE_CHANNEL_ID)
-    if not archive_ch:
-        return
-    
+    """Save bot status to archive (edited in place)"""
     data = {
         "event_type": BOT_STATUS_ARCHIVE_TYPE,
         "status": bot_status_data["status"],
@@ -435,26 +472,17 @@ async def save_bot_status():
         "saved_at": datetime.now(timezone.utc).isoformat()
     }
     
-    await archive_details_to_mod_channel(data)
+    await save_singleton(BOT_STATUS_ARCHIVE_TYPE, data)
 
 async def load_bot_status():
     """Load bot status from archive"""
     global bot_status_data
     
-    archive_ch = await ensure_channel(MOD_ARCHIVE_CHANNEL_ID)
-    if not archive_ch:
-        return
-    
-    try:
-        async for m in archive_ch.history(limit=100):
-            parsed = _extract_json_from_codeblock(m.content or "")
-            if parsed and parsed.get("event_type") == BOT_STATUS_ARCHIVE_TYPE:
-                bot_status_data["status"] = parsed.get("status", "Online")
-                bot_status_data["message_id"] = parsed.get("message_id")
-                bot_status_data["last_updated"] = parsed.get("last_updated")
-                break
-    except Exception:
-        pass
+    _, parsed = get_archive_singleton(BOT_STATUS_ARCHIVE_TYPE)
+    if parsed:
+        bot_status_data["status"] = parsed.get("status", "Online")
+        bot_status_data["message_id"] = parsed.get("message_id")
+        bot_status_data["last_updated"] = parsed.get("last_updated")
 
 async def update_bot_status_embed():
     """Update or create the bot status embed"""
@@ -599,60 +627,818 @@ async def ensure_channel(channel_id: int) -> Optional[discord.TextChannel]:
         return None
 
 def _extract_json_from_codeblock(content: str) -> Optional[Dict[str, Any]]:
-    if not content:
+    # Understands every archive codec version, including legacy indented records
+    return decode_record(content)
+
+# ------------------------
+# Archive routing (one thread per record type)
+# ------------------------
+# High-volume record types are written to their own thread under MOD_ARCHIVE, so each type
+# pages only through its own records and gets its own rate-limit bucket. The routes live in
+# the pinned manifest; singletons and the manifest itself stay in the main channel.
+ARCHIVE_SHARDING_ENABLED = os.environ.get("ARCHIVE_SHARDING", "1") != "0"
+ARCHIVE_ROUTED_TYPES = ("infract", "promote", "ia_case", "ticket", "antiping")
+ARCHIVE_THREAD_AUTO_ARCHIVE = 10080  # minutes
+ARCHIVED_THREAD_ERROR = 50083  # Discord's error code for writing to an archived thread
+
+archive_routes: Dict[str, int] = {}  # event_type -> archive thread id
+_route_lock = asyncio.Lock()
+
+async def _reopen_archive_thread(ch) -> bool:
+    """Un-archive a route thread that went idle, so its records can be edited again"""
+    if not isinstance(ch, discord.Thread):
+        return False
+    try:
+        await ch.edit(archived=False)
+        return True
+    except Exception:
+        logger.exception(f"Failed to unarchive archive thread {ch.id}")
+        return False
+
+async def _ensure_archive_location(location_id: int):
+    ch = await ensure_channel(location_id)
+    if isinstance(ch, discord.Thread) and ch.archived:
+        await _reopen_archive_thread(ch)
+    return ch
+
+async def _open_archive_route(event_type: str):
+    tid = archive_routes.get(event_type)
+    if not tid:
         return None
-    content = content.strip()
-    if content.startswith("```") and content.endswith("```"):
-        lines = content.splitlines()
-        if len(lines) >= 3:
-            inner = "\n".join(lines[1:-1])
-        else:
-            inner = ""
-    else:
-        inner = content
+    return await _ensure_archive_location(tid)
+
+async def archive_channel_for(event_type: Optional[str]):
+    """Channel or thread that new records of this type are written to"""
+    main = await ensure_channel(MOD_ARCHIVE_CHANNEL_ID)
+    if not main or not ARCHIVE_SHARDING_ENABLED or event_type not in ARCHIVE_ROUTED_TYPES:
+        return main
+    ch = await _open_archive_route(event_type)
+    if ch:
+        return ch
+    async with _route_lock:
+        ch = await _open_archive_route(event_type)
+        if ch:
+            return ch
+        try:
+            thread = await main.create_thread(
+                name=f"archive-{event_type}",
+                type=discord.ChannelType.public_thread,
+                auto_archive_duration=ARCHIVE_THREAD_AUTO_ARCHIVE,
+            )
+        except Exception:
+            logger.exception(f"Failed to create archive thread for {event_type}")
+            return main
+        archive_routes[event_type] = thread.id
+        async with _manifest_lock:
+            await _save_archive_manifest()
+        return thread
+
+async def archive_channel_for_record(archive_msg_id: int):
+    """Channel or thread holding an existing archive record"""
     try:
-        return json.loads(inner)
+        location = archive_store.location(archive_msg_id)
     except Exception:
-        m = re.search(r"\{.*\}", inner, flags=re.DOTALL)
-        if m:
+        location = None
+    return await _ensure_archive_location(location or MOD_ARCHIVE_CHANNEL_ID)
+
+async def fetch_archive_message(archive_msg_id: int) -> Optional[discord.Message]:
+    """Fetch an archive message from wherever it was routed; raises like fetch_message"""
+    ch = await archive_channel_for_record(archive_msg_id)
+    if not ch:
+        return None
+    return await ch.fetch_message(archive_msg_id)
+
+def _mirror_archive_record(archive_msg_id: int, details: Dict[str, Any], location: Optional[int] = None):
+    """Keep the local archive store in step with a record written to Discord"""
+    try:
+        _reheat_cold_record(archive_msg_id)
+        archive_store.upsert(archive_msg_id, details, location=location)
+    except Exception:
+        logger.exception(f"Failed to mirror archive record {archive_msg_id}")
+    if archive_msg_id in _archive_read_cache:
+        _cache_archive_read(archive_msg_id, details)
+    _index_archive_record(archive_msg_id, details)
+
+# ------------------------
+# Parallel history loader
+# ------------------------
+# history() pages strictly one after another, so a long range is split into snowflake (time)
+# windows fetched concurrently. Messages are parsed as they arrive, and each window is handed
+# over in order, so a window that fails never leaves a gap behind what was already committed.
+HISTORY_LOADER_CONCURRENCY = 4  # windows in flight; discord.py still waits out any 429
+HISTORY_LOADER_MAX_WINDOWS = 16
+HISTORY_LOADER_MIN_WINDOW = 6 * 3600  # seconds; shorter ranges are read in one pass
+HISTORY_LOADER_QUEUE_MAX = 1000
+
+def _history_windows(after_id: int, before_id: int) -> List[tuple]:
+    span_seconds = ((before_id >> 22) - (after_id >> 22)) // 1000
+    count = max(1, min(HISTORY_LOADER_MAX_WINDOWS, span_seconds // HISTORY_LOADER_MIN_WINDOW))
+    step = (before_id - after_id) // count
+    bounds = [after_id + step * i for i in range(count)] + [before_id]
+    # after= and before= are both exclusive: step each later window back one id so none is skipped
+    return [(lo - 1 if i else lo, hi) for i, (lo, hi) in enumerate(zip(bounds, bounds[1:]))]
+
+async def load_history_parallel(channel, after_id: Optional[int], parse, commit) -> int:
+    """Read a channel's history after a message id in concurrent windows.
+
+    parse(message) returns an item or None; commit(items) gets the items in batches, oldest window first.
+    A window that is not the oldest one still loading buffers at most HISTORY_LOADER_QUEUE_MAX messages
+    before its fetcher waits for its turn, so memory stays bounded however far ahead it gets.
+    """
+    lower = after_id or channel.id  # nothing in a channel predates the channel itself
+    upper = discord.utils.time_snowflake(datetime.now(timezone.utc))
+    windows = _history_windows(lower, upper) if upper > lower else [(lower, upper)]
+    last = len(windows) - 1
+    semaphore = asyncio.Semaphore(HISTORY_LOADER_CONCURRENCY)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=HISTORY_LOADER_QUEUE_MAX)
+    turns = [asyncio.Event() for _ in windows]  # set once a window is the oldest still loading
+    turns[0].set()
+
+    async def _fetch(index: int, lo: int, hi: int):
+        async with semaphore:
             try:
-                return json.loads(m.group(0))
-            except Exception:
+                # The newest window stays open-ended so messages sent meanwhile are not missed
+                before = discord.Object(id=hi) if index < last else None
+                fetched = 0
+                async for m in channel.history(limit=None, after=discord.Object(id=lo), before=before, oldest_first=True):
+                    fetched += 1
+                    if fetched > HISTORY_LOADER_QUEUE_MAX:
+                        await turns[index].wait()
+                    await queue.put((index, m))
+            except Exception as e:
+                await queue.put((index, e))
+                return
+            await queue.put((index, None))
+
+    fetchers = [asyncio.create_task(_fetch(i, lo, hi)) for i, (lo, hi) in enumerate(windows)]
+    pending: Dict[int, list] = {i: [] for i in range(len(windows))}
+    finished: Set[int] = set()
+    next_window = 0
+    committed = 0
+
+    def _commit_pending(index: int):
+        nonlocal committed
+        items = pending[index]
+        if items:
+            commit(items)
+            committed += len(items)
+            pending[index] = []
+
+    try:
+        while next_window < len(windows):
+            index, item = await queue.get()
+            if isinstance(item, Exception):
+                raise item
+            if item is None:
+                finished.add(index)
+                while next_window in finished:
+                    _commit_pending(next_window)
+                    pending.pop(next_window)
+                    next_window += 1
+                    if next_window < len(windows):
+                        turns[next_window].set()
+                continue
+            parsed = parse(item)
+            if parsed is not None:
+                pending[index].append(parsed)
+                # Everything older is committed, so the oldest window streams out in batches
+                if index == next_window and len(pending[index]) >= HISTORY_LOADER_QUEUE_MAX:
+                    _commit_pending(index)
+    finally:
+        for fetcher in fetchers:
+            fetcher.cancel()
+    return committed
+
+def _parse_archive_message(m: discord.Message) -> Optional[tuple]:
+    """(message id, record) for a record, (message id, [records]) for a journal message"""
+    # Non-record messages are skipped before any JSON parsing
+    parsed = decode_archive_content(m.content or "")
+    return (m.id, parsed) if parsed else None
+
+async def _sync_archive_location(archive_ch, index: bool = False) -> int:
+    # The main channel also owns rows mirrored before sharding (no location recorded)
+    head = archive_store.head_id(archive_ch.id, include_unset=archive_ch.id == MOD_ARCHIVE_CHANNEL_ID)
+
+    def _commit(items: List[tuple]):
+        records = [(aid, parsed) for aid, parsed in items if isinstance(parsed, dict)]
+        archive_store.upsert_many(records, location=archive_ch.id)
+        for aid, parsed in items:
+            if isinstance(parsed, list):
+                archive_store.upsert_journal(aid, parsed, location=archive_ch.id)
+        if index:
+            for aid, parsed in records:
+                _index_archive_record(aid, parsed)
+
+    return await load_history_parallel(archive_ch, head, _parse_archive_message, _commit)
+
+async def sync_archive_store(index: bool = False):
+    """Mirror archive messages newer than the local store head into SQLite (and the index)"""
+    location_ids = [MOD_ARCHIVE_CHANNEL_ID] + [tid for tid in archive_routes.values() if tid != MOD_ARCHIVE_CHANNEL_ID]
+    mirrored = 0
+    for location_id in location_ids:
+        archive_ch = await ensure_channel(location_id)
+        if not archive_ch:
+            continue
+        try:
+            mirrored += await _sync_archive_location(archive_ch, index=index)
+        except Exception:
+            logger.exception(f"Failed to sync archive store from {location_id}")
+    logger.info(f"Archive store synced: {mirrored} new records")
+
+def _serialize_archive_record(details: Dict[str, Any]) -> str:
+    return encode_record(details, ARCHIVE_CODEC_VERSION)
+
+async def archive_details_to_mod_channel(details: Dict[str, Any], durable: bool = True) -> Optional[int]:
+    """Write a new archive record and return its message id.
+
+    Durable writes Discord does not take within ARCHIVE_SEND_TIMEOUT go to the outbox and get a
+    provisional id instead; callers that need the real message right away pass durable=False.
+    """
+    normalize_record(details)
+    archive_content = _serialize_archive_record(details)
+    if durable and _archive_outbox:
+        # Discord is already failing: queue behind the earlier writes without waiting on it
+        return _queue_archive_send(details, archive_content)
+    archive_ch = await archive_channel_for(details.get("event_type"))
+    if not archive_ch:
+        return _queue_archive_send(details, archive_content) if durable else None
+    # Marked before the request goes out: the gateway may echo the message before it returns
+    sending = _begin_archive_send(archive_content)
+    try:
+        return await _send_new_archive_record(archive_ch, details, archive_content, durable)
+    finally:
+        _end_archive_send(sending)
+
+async def _send_new_archive_record(archive_ch, details: Dict[str, Any], archive_content: str, durable: bool) -> Optional[int]:
+    if not durable:
+        try:
+            msg = await archive_ch.send(content=archive_content)
+        except Exception:
+            return None
+    else:
+        send = asyncio.ensure_future(archive_ch.send(content=archive_content))
+        try:
+            msg = await asyncio.wait_for(asyncio.shield(send), ARCHIVE_SEND_TIMEOUT)
+        except asyncio.TimeoutError:
+            # The send keeps going in the background; the outbox adopts it if it lands
+            return _queue_archive_send(details, archive_content, inflight=send)
+        except Exception as e:
+            if _archive_error_is_permanent(e):
+                logger.error(f"Archive channel {archive_ch.id} rejected a record ({e.status}), not retrying")
                 return None
-    return None
+            logger.warning("Archive write failed, queued in the outbox")
+            return _queue_archive_send(details, archive_content)
+    _remember_archive_content(msg.id, archive_content)
+    _mirror_archive_record(msg.id, details, location=archive_ch.id)
+    return msg.id
 
-async def archive_details_to_mod_channel(details: Dict[str, Any]) -> Optional[int]:
-    archive_ch = await ensure_channel(MOD_ARCHIVE_CHANNEL_ID)
+# ------------------------
+# Write-behind buffer for archive edits
+# ------------------------
+# Edits to the same record within one flush window collapse into a single Discord edit,
+# and edits that would not change what Discord already holds are dropped.
+ARCHIVE_FLUSH_INTERVAL = 5.0  # seconds
+ARCHIVE_WRITTEN_CACHE_MAX = 10000
+
+_pending_archive_edits: Dict[int, str] = {}  # archive msg id -> latest serialized content
+# archive msg id -> hash of the content last written to Discord (LRU)
+_archive_written_hashes: "OrderedDict[int, int]" = OrderedDict()
+# Writes whose request is out but whose response is not back yet, so the live tail can tell
+# the gateway echo of our own write from someone else's change
+_archive_writes_in_flight: Dict[int, int] = {}  # archive msg id -> hash of the edit being written
+_archive_sends_in_flight: Dict[int, int] = {}  # content hash -> sends of that content in progress
+_archive_flush_task: Optional[asyncio.Task] = None
+
+def _begin_archive_send(content: str) -> int:
+    content_hash = hash(content)
+    _archive_sends_in_flight[content_hash] = _archive_sends_in_flight.get(content_hash, 0) + 1
+    return content_hash
+
+def _end_archive_send(content_hash: int):
+    remaining = _archive_sends_in_flight.get(content_hash, 0) - 1
+    if remaining > 0:
+        _archive_sends_in_flight[content_hash] = remaining
+    else:
+        _archive_sends_in_flight.pop(content_hash, None)
+
+def _remember_archive_content(archive_msg_id: int, content: str):
+    _archive_written_hashes[archive_msg_id] = hash(content)
+    _archive_written_hashes.move_to_end(archive_msg_id)
+    while len(_archive_written_hashes) > ARCHIVE_WRITTEN_CACHE_MAX:
+        _archive_written_hashes.popitem(last=False)
+
+def _archive_content_unchanged(archive_msg_id: int, content: str) -> bool:
+    # Only what Discord is known to hold counts: the local store may carry an unwritten edit
+    known = _archive_written_hashes.get(archive_msg_id)
+    return known is not None and known == hash(content)
+
+async def _deliver_archive_edit(archive_msg_id: int, content: str) -> bool:
+    """Edit an archive message now; raises like PartialMessage.edit"""
+    archive_ch = await archive_channel_for_record(archive_msg_id)
     if not archive_ch:
-        return None
+        return False
+    content_hash = hash(content)
+    _archive_writes_in_flight[archive_msg_id] = content_hash
     try:
-        details_serializable = json.dumps(details, default=str, ensure_ascii=False, indent=2)
+        # A partial message edits without fetching the message first
+        try:
+            await archive_ch.get_partial_message(archive_msg_id).edit(content=content)
+        except discord.HTTPException as e:
+            # The cached thread looked open but Discord had archived it: reopen and write again
+            if e.code != ARCHIVED_THREAD_ERROR or not await _reopen_archive_thread(archive_ch):
+                raise
+            await archive_ch.get_partial_message(archive_msg_id).edit(content=content)
+        _remember_archive_content(archive_msg_id, content)
+    finally:
+        if _archive_writes_in_flight.get(archive_msg_id) == content_hash:
+            _archive_writes_in_flight.pop(archive_msg_id, None)
+    return True
+
+async def _write_archive_edit(archive_msg_id: int, content: str) -> bool:
+    """Edit an archive message; transient failures are queued in the outbox and count as written"""
+    archive_msg_id = resolve_archive_id(archive_msg_id)
+    if _archive_outbox:
+        # Keep the write order while earlier writes (maybe this record's own send) are queued
+        _queue_archive_edit(archive_msg_id, content)
+        return True
+    try:
+        return await _deliver_archive_edit(archive_msg_id, content)
+    except Exception as e:
+        if _archive_error_is_permanent(e):
+            logger.warning(f"Archive edit for {archive_msg_id} rejected ({e.status}), not retrying")
+            return False
+        logger.warning(f"Archive edit for {archive_msg_id} failed, queued in the outbox")
+        _queue_archive_edit(archive_msg_id, content)
+        return True
+
+async def flush_archive_edits():
+    """Write every buffered archive edit now"""
+    while _pending_archive_edits:
+        archive_msg_id = next(iter(_pending_archive_edits))
+        content = _pending_archive_edits.pop(archive_msg_id)
+        await _write_archive_edit(archive_msg_id, content)
+
+async def _delayed_archive_flush():
+    await asyncio.sleep(ARCHIVE_FLUSH_INTERVAL)
+    try:
+        await flush_archive_edits()
     except Exception:
-        details_serializable = json.dumps({k: str(v) for k, v in details.items()}, ensure_ascii=False, indent=2)
-    archive_content = f"```json\n{details_serializable}\n```"
+        logger.exception("Archive edit flush failed")
+
+def _schedule_archive_flush():
+    global _archive_flush_task
+    if _archive_flush_task is None or _archive_flush_task.done():
+        _archive_flush_task = asyncio.create_task(_delayed_archive_flush())
+
+# ------------------------
+# Durable archive outbox
+# ------------------------
+# Archive writes Discord does not accept (outage, 429 storm, timeout) are appended to
+# ARCHIVE_OUTBOX_PATH and replayed in order with backoff. A queued send hands its caller a
+# provisional id (a snowflake for the time it was queued) and is mirrored locally under it right
+# away; once delivered, the provisional id becomes an alias of the real message id. While
+# anything is queued, new writes queue behind it instead of waiting on Discord.
+ARCHIVE_SEND_TIMEOUT = 5.0  # seconds a durable send may hold up its caller
+OUTBOX_RETRY_MIN = 5.0
+OUTBOX_RETRY_MAX = 600.0
+OUTBOX_LANDED_SLACK_MS = 60_000  # how far before its provisional id a send that did land is looked for
+OUTBOX_LANDED_SCAN = 100
+PROVISIONAL_LOCATION = 0  # store location of records not on Discord yet
+ARCHIVE_ALIAS_META_PREFIX = "archive_alias:"
+
+_archive_outbox: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()  # provisional/archive msg id -> entry
+_outbox_inflight: Dict[int, asyncio.Future] = {}  # provisional id -> send still in progress
+_archive_aliases: Dict[int, int] = {}  # provisional id -> archive msg id it was delivered as
+_provisional_by_hash: Dict[int, int] = {}  # content hash (any version queued) -> provisional id
+_last_provisional_id = 0
+_outbox_task: Optional[asyncio.Task] = None
+
+def resolve_archive_id(archive_msg_id: int) -> int:
+    """Real archive message id for a provisional id handed out by the outbox"""
+    return _archive_aliases.get(archive_msg_id, archive_msg_id)
+
+def _provisional_archive_id() -> int:
+    global _last_provisional_id
+    candidate = discord.utils.time_snowflake(datetime.now(timezone.utc))
+    _last_provisional_id = max(candidate, _last_provisional_id + 1)
+    return _last_provisional_id
+
+def _append_outbox_line(entry: Dict[str, Any]):
     try:
-        msg = await archive_ch.send(content=archive_content)
-        return msg.id
+        with open(ARCHIVE_OUTBOX_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
     except Exception:
-        return None
+        logger.exception("Failed to append to the archive outbox")
 
-async def edit_archive_message(archive_msg_id: int, details: Dict[str, Any]) -> bool:
-    archive_ch = await ensure_channel(MOD_ARCHIVE_CHANNEL_ID)
+def _rewrite_outbox_file():
+    """Compact the outbox file down to the entries still queued"""
+    try:
+        if not _archive_outbox:
+            if os.path.exists(ARCHIVE_OUTBOX_PATH):
+                os.remove(ARCHIVE_OUTBOX_PATH)
+            return
+        tmp_path = ARCHIVE_OUTBOX_PATH + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for entry in _archive_outbox.values():
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, ARCHIVE_OUTBOX_PATH)
+    except Exception:
+        logger.exception("Failed to compact the archive outbox")
+
+def _queue_archive_send(
+    details: Dict[str, Any],
+    content: str,
+    inflight: Optional[asyncio.Future] = None,
+    journal: Optional[List[Dict[str, Any]]] = None,
+) -> int:
+    """Queue a new archive message; journal carries the records of a journal message"""
+    provisional_id = _provisional_archive_id()
+    entry = {"op": "send", "key": provisional_id, "event_type": details.get("event_type"), "content": content}
+    _archive_outbox[provisional_id] = entry
+    _append_outbox_line(entry)
+    _provisional_by_hash[hash(content)] = provisional_id
+    if inflight is not None:
+        _outbox_inflight[provisional_id] = inflight
+    if journal is not None:
+        try:
+            archive_store.upsert_journal(provisional_id, journal, location=PROVISIONAL_LOCATION)
+        except Exception:
+            logger.exception(f"Failed to mirror queued archive journal {provisional_id}")
+    else:
+        _mirror_archive_record(provisional_id, details, location=PROVISIONAL_LOCATION)
+    start_outbox_replay()
+    return provisional_id
+
+def _queue_archive_edit(archive_msg_id: int, content: str):
+    entry = _archive_outbox.get(archive_msg_id)
+    if entry:
+        # Same record already queued (its send, or an earlier edit): the newest content wins
+        entry["content"] = content
+        _append_outbox_line(entry)
+        if entry.get("op") == "send":
+            # An earlier version may still land, so every queued version is recognised
+            _provisional_by_hash[hash(content)] = archive_msg_id
+    else:
+        entry = {"op": "edit", "key": archive_msg_id, "content": content}
+        _archive_outbox[archive_msg_id] = entry
+        _append_outbox_line(entry)
+    start_outbox_replay()
+
+def load_archive_outbox():
+    """Restore queued writes and delivered aliases after a restart"""
+    for key, value in archive_store.meta_items(ARCHIVE_ALIAS_META_PREFIX):
+        try:
+            _archive_aliases[int(key[len(ARCHIVE_ALIAS_META_PREFIX):])] = int(value)
+        except Exception:
+            continue
+    try:
+        with open(ARCHIVE_OUTBOX_PATH, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    key = int(entry["key"])
+                except Exception:
+                    continue  # a line torn by a crash mid-append
+                if entry.get("op") == "done":
+                    _archive_outbox.pop(key, None)
+                elif key in _archive_outbox:
+                    _archive_outbox[key].update(entry)
+                else:
+                    _archive_outbox[key] = entry
+    except FileNotFoundError:
+        return
+    except Exception:
+        logger.exception("Failed to load the archive outbox")
+    for key, entry in _archive_outbox.items():
+        # A send queued before the restart may still have landed
+        entry["recovered"] = entry.get("op") == "send"
+        if entry["recovered"]:
+            _provisional_by_hash[hash(entry.get("content") or "")] = key
+    _rewrite_outbox_file()
+    if _archive_outbox:
+        logger.info(f"Archive outbox: {len(_archive_outbox)} queued writes to replay")
+
+async def _find_landed_archive_send(archive_ch, provisional_id: int, content: str) -> Optional[discord.Message]:
+    # The content is the idempotency key: a landed copy is adopted instead of sent again
+    after = discord.Object(id=max(provisional_id - (OUTBOX_LANDED_SLACK_MS << 22), 0))
+    async for m in archive_ch.history(limit=OUTBOX_LANDED_SCAN, after=after, oldest_first=True):
+        if m.author.id == bot.user.id and m.content == content:
+            return m
+    return None
+
+def _adopt_outbox_send(provisional_id: int, msg: discord.Message, content: str):
+    """Move a delivered record from its provisional id to its archive message id"""
+    if provisional_id in _archive_aliases:
+        return  # already adopted (the live tail can see the message before the send returns)
+    for content_hash in [h for h, pid in _provisional_by_hash.items() if pid == provisional_id]:
+        _provisional_by_hash.pop(content_hash, None)
+    # An edit still buffered for the provisional id follows the record
+    buffered = _pending_archive_edits.pop(provisional_id, None)
+    _remember_archive_content(msg.id, msg.content)
+    _forget_archive_record(provisional_id)
+    packed = decode_journal(content)
+    if packed is not None:
+        try:
+            archive_store.upsert_journal(msg.id, packed, location=msg.channel.id)
+        except Exception:
+            logger.exception(f"Failed to mirror archive journal {msg.id}")
+    else:
+        details = _extract_json_from_codeblock(buffered or content) or {}
+        _mirror_archive_record(msg.id, details, location=msg.channel.id)
+    if buffered:
+        _pending_archive_edits[msg.id] = buffered
+        _schedule_archive_flush()
+    _archive_aliases[provisional_id] = msg.id
+    try:
+        archive_store.set_meta(f"{ARCHIVE_ALIAS_META_PREFIX}{provisional_id}", msg.id)
+    except Exception:
+        logger.exception(f"Failed to record archive alias {provisional_id} -> {msg.id}")
+    for entry in anti_ping_map.values():
+        if entry.get("archive_msg_id") == provisional_id:
+            entry["archive_msg_id"] = msg.id
+
+def _archive_error_is_permanent(error: BaseException) -> bool:
+    """A 4xx other than 429: the same request will be rejected again, so it is never queued or retried"""
+    return isinstance(error, discord.HTTPException) and 400 <= error.status < 500 and error.status != 429
+
+def _drop_outbox_send(provisional_id: int, error: discord.HTTPException):
+    """Give up on a queued send Discord rejected; the provisional record goes with it"""
+    logger.error(f"Archive outbox: record {provisional_id} rejected ({error.status}), dropping it")
+    for content_hash in [h for h, pid in _provisional_by_hash.items() if pid == provisional_id]:
+        _provisional_by_hash.pop(content_hash, None)
+    _pending_archive_edits.pop(provisional_id, None)
+    _forget_archive_record(provisional_id)
+
+def _settle_landed_send(provisional_id: int, entry: Dict[str, Any], msg: discord.Message) -> bool:
+    """Adopt a queued send found on Discord; False if a newer queued version still has to be written"""
+    _adopt_outbox_send(provisional_id, msg, entry["content"])
+    if msg.content == entry["content"]:
+        return True
+    # Edited while the send was in flight: what is left is an edit of the landed message
+    if entry.get("op") != "edit":
+        entry["op"] = "edit"
+        _append_outbox_line(entry)
+    return False
+
+def _settle_tailed_send(provisional_id: int, msg: discord.Message):
+    """The live tail saw a queued send land before the outbox got its response"""
+    entry = _archive_outbox.get(provisional_id)
+    if entry is None:
+        return
+    if _settle_landed_send(provisional_id, entry, msg):
+        _archive_outbox.pop(provisional_id, None)
+        _outbox_inflight.pop(provisional_id, None)
+        _append_outbox_line({"op": "done", "key": provisional_id})
+
+async def _replay_outbox_send(provisional_id: int, entry: Dict[str, Any]) -> bool:
+    content = entry["content"]
+    inflight = _outbox_inflight.pop(provisional_id, None)
+    if inflight is not None:
+        try:
+            msg = await asyncio.wait_for(asyncio.shield(inflight), OUTBOX_RETRY_MAX)
+            if _settle_landed_send(provisional_id, entry, msg):
+                return True
+            return await _replay_outbox_edit(provisional_id, entry)
+        except asyncio.TimeoutError:
+            _outbox_inflight[provisional_id] = inflight
+            return False
+        except Exception as e:
+            if _archive_error_is_permanent(e):
+                _drop_outbox_send(provisional_id, e)
+                return True
+            entry["recovered"] = True  # it may have landed before failing
+    archive_ch = await archive_channel_for(entry.get("event_type"))
     if not archive_ch:
         return False
     try:
-        archive_msg = await archive_ch.fetch_message(archive_msg_id)
-    except Exception:
+        if entry.get("recovered"):
+            landed = await _find_landed_archive_send(archive_ch, provisional_id, content)
+            if landed:
+                _adopt_outbox_send(provisional_id, landed, content)
+                return True
+        sending = _begin_archive_send(content)
+        try:
+            msg = await archive_ch.send(content=content)
+        finally:
+            _end_archive_send(sending)
+    except Exception as e:
+        if _archive_error_is_permanent(e):
+            _drop_outbox_send(provisional_id, e)
+            return True
+        entry["recovered"] = True
         return False
+    _adopt_outbox_send(provisional_id, msg, content)
+    return True
+
+async def _replay_outbox_edit(archive_msg_id: int, entry: Dict[str, Any]) -> bool:
     try:
-        content = json.dumps(details, default=str, ensure_ascii=False, indent=2)
+        if not await _deliver_archive_edit(resolve_archive_id(archive_msg_id), entry["content"]):
+            logger.warning(f"Archive outbox: record {archive_msg_id} has no archive channel, dropping its edit")
+    except Exception as e:
+        if not _archive_error_is_permanent(e):
+            return False
+        logger.warning(f"Archive outbox: edit of record {archive_msg_id} rejected ({e.status}), dropping it")
+    return True
+
+async def replay_archive_outbox():
+    """Deliver queued writes oldest first, backing off while Discord keeps failing"""
+    delay = OUTBOX_RETRY_MIN
+    while _archive_outbox:
+        key, entry = next(iter(_archive_outbox.items()))
+        try:
+            if entry.get("op") == "send":
+                delivered = await _replay_outbox_send(key, entry)
+            else:
+                delivered = await _replay_outbox_edit(key, entry)
+        except Exception:
+            logger.exception(f"Archive outbox replay of {key} failed")
+            delivered = False
+        if not delivered:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, OUTBOX_RETRY_MAX)
+            continue
+        delay = OUTBOX_RETRY_MIN
+        if _archive_outbox.get(key) is entry:
+            _archive_outbox.pop(key)
+            _append_outbox_line({"op": "done", "key": key})
+    _rewrite_outbox_file()
+    logger.info("Archive outbox drained")
+
+def start_outbox_replay():
+    global _outbox_task
+    if _archive_outbox and (_outbox_task is None or _outbox_task.done()):
+        _outbox_task = asyncio.create_task(replay_archive_outbox())
+
+async def edit_archive_message(archive_msg_id: int, details: Dict[str, Any], immediate: bool = False) -> bool:
+    """Update an archive record; buffered unless immediate, local readers see it right away"""
+    archive_msg_id = resolve_archive_id(archive_msg_id)
+    normalize_record(details)
+    content = _serialize_archive_record(details)
+    if _archive_content_unchanged(archive_msg_id, content):
+        # Back to what Discord holds: drop the pending edit, but local readers still follow
+        _pending_archive_edits.pop(archive_msg_id, None)
+        _mirror_archive_record(archive_msg_id, details)
+        return True
+    if immediate:
+        _pending_archive_edits.pop(archive_msg_id, None)
+        if not await _write_archive_edit(archive_msg_id, content):
+            return False
+        _mirror_archive_record(archive_msg_id, details)
+        return True
+    _pending_archive_edits[archive_msg_id] = content
+    _mirror_archive_record(archive_msg_id, details)
+    _schedule_archive_flush()
+    return True
+
+# ------------------------
+# Archive read cache
+# ------------------------
+# Bounded LRU of parsed archive records so repeated reads (Expand clicks, anti-ping buttons,
+# IA -close/-reopen) cost no REST calls. Our own writes refresh entries; edits from anyone
+# else evict them via on_raw_message_edit.
+ARCHIVE_READ_CACHE_MAX = 512
+
+_archive_read_cache: "OrderedDict[int, tuple]" = OrderedDict()  # archive msg id -> (edited_at, record)
+
+def _cache_archive_read(archive_msg_id: int, details: Dict[str, Any], edited_at: Optional[datetime] = None):
+    _archive_read_cache[archive_msg_id] = (edited_at, copy.deepcopy(details))
+    _archive_read_cache.move_to_end(archive_msg_id)
+    while len(_archive_read_cache) > ARCHIVE_READ_CACHE_MAX:
+        _archive_read_cache.popitem(last=False)
+
+def invalidate_archive_read(archive_msg_id: int):
+    _archive_read_cache.pop(archive_msg_id, None)
+
+async def get_archive_record(archive_msg_id: int) -> Optional[Dict[str, Any]]:
+    """Parsed archive record, fetched from Discord only on a cache miss"""
+    archive_msg_id = resolve_archive_id(archive_msg_id)
+    if archive_msg_id in _archive_outbox:
+        # Not on Discord yet; the local store holds the latest version
+        return archive_store.get(archive_msg_id)
+    entry = _archive_read_cache.get(archive_msg_id)
+    if entry:
+        _archive_read_cache.move_to_end(archive_msg_id)
+        return copy.deepcopy(entry[1])
+    try:
+        msg = await fetch_archive_message(archive_msg_id)
     except Exception:
-        content = json.dumps({k: str(v) for k, v in details.items()}, ensure_ascii=False, indent=2)
+        return None
+    if not msg:
+        return None
+    parsed = _extract_json_from_codeblock(msg.content or "")
+    if parsed:
+        _cache_archive_read(archive_msg_id, parsed, msg.edited_at)
+    return parsed
+
+# ------------------------
+# Archive journal
+# ------------------------
+# Small log-style records are packed many to a message (NDJSON in a code block) instead of
+# getting an archive message each. They are buffered and sent when a message's worth has built
+# up or JOURNAL_FLUSH_INTERVAL has passed; the local store keeps them in its journal table.
+# Journal messages are durable writes: one Discord does not take goes to the outbox like any
+# other record, so the buffer only ever holds what arrived since the last flush.
+ARCHIVE_JOURNAL_ENABLED = os.environ.get("ARCHIVE_JOURNAL", "1") != "0"
+ARCHIVE_JOURNAL_TYPES = (
+    "message_trigger", "slash_command", "new_account_join", "raid_detected",
+    "channel_created", "channel_deleted", "role_created",
+)
+JOURNAL_FLUSH_INTERVAL = 30.0  # seconds
+
+_journal_buffer: List[Dict[str, Any]] = []
+_journal_bytes = 0
+_journal_lock = asyncio.Lock()
+_journal_full = asyncio.Event()  # a message's worth is buffered: flush without waiting out the interval
+_journal_flush_task: Optional[asyncio.Task] = None
+
+def _journal_line_size(details: Dict[str, Any]) -> int:
+    return len(dumps_compact(details)) + 1
+
+def journal_archive_event(details: Dict[str, Any]):
+    """Queue a small record for the next journal message"""
+    global _journal_bytes, _journal_flush_task
+    normalize_record(details)
+    _journal_buffer.append(details)
+    _journal_bytes += _journal_line_size(details)
+    if _journal_bytes >= DISCORD_MESSAGE_LIMIT:
+        _journal_full.set()
+    # One flusher at a time, however fast events arrive
+    if _journal_flush_task is None or _journal_flush_task.done():
+        _journal_flush_task = asyncio.create_task(_journal_flush_loop())
+
+async def _send_archive_journal(batch: List[Dict[str, Any]]):
+    """Write one journal message, handing it to the outbox if Discord does not take it"""
+    content = encode_journal(batch)
+    archive_ch = await archive_channel_for(None)
+    if _archive_outbox or not archive_ch:
+        _queue_archive_send({}, content, journal=batch)
+        return
+    sending = _begin_archive_send(content)
     try:
-        await archive_msg.edit(content=f"```json\n{content}\n```")
-        return True
+        send = asyncio.ensure_future(archive_ch.send(content=content))
+        try:
+            msg = await asyncio.wait_for(asyncio.shield(send), ARCHIVE_SEND_TIMEOUT)
+        except asyncio.TimeoutError:
+            _queue_archive_send({}, content, inflight=send, journal=batch)
+            return
+        except Exception as e:
+            if _archive_error_is_permanent(e):
+                logger.error(f"Archive journal of {len(batch)} records rejected ({e.status}), not retrying")
+                return
+            logger.warning("Archive journal write failed, queued in the outbox")
+            _queue_archive_send({}, content, journal=batch)
+            return
+    finally:
+        _end_archive_send(sending)
+    _remember_archive_content(msg.id, content)
+    try:
+        archive_store.upsert_journal(msg.id, batch, location=archive_ch.id)
     except Exception:
-        return False
+        logger.exception(f"Failed to mirror archive journal {msg.id}")
+
+async def flush_archive_journal():
+    """Send every buffered journal record, as many to a message as fit"""
+    global _journal_bytes
+    async with _journal_lock:
+        _journal_full.clear()
+        while _journal_buffer:
+            count = 0
+            size = len(encode_journal([]))
+            for details in _journal_buffer:
+                line = _journal_line_size(details)
+                if count and size + line > DISCORD_MESSAGE_LIMIT:
+                    break
+                size += line
+                count += 1
+            # Taken out before the send: records arriving meanwhile go to the next message
+            batch = _journal_buffer[:count]
+            del _journal_buffer[:count]
+            _journal_bytes = sum(_journal_line_size(details) for details in _journal_buffer)
+            if size > DISCORD_MESSAGE_LIMIT:
+                # Too big to pack: it becomes a record of its own
+                await archive_details_to_mod_channel(batch[0])
+                continue
+            await _send_archive_journal(batch)
+
+async def _journal_flush_loop():
+    """The one task that flushes the journal; backs off while flushes keep failing"""
+    delay = OUTBOX_RETRY_MIN
+    while _journal_buffer:
+        try:
+            await asyncio.wait_for(_journal_full.wait(), JOURNAL_FLUSH_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+        try:
+            await flush_archive_journal()
+            delay = OUTBOX_RETRY_MIN
+        except Exception:
+            logger.exception("Archive journal flush failed")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, OUTBOX_RETRY_MAX)
 
 async def send_embed_with_expand(target_channel: discord.abc.GuildChannel | discord.TextChannel, embed: discord.Embed, details: Dict[str, Any]):
     try:
@@ -669,6 +1455,8 @@ async def send_embed_with_expand(target_channel: discord.abc.GuildChannel | disc
                 except Exception:
                     pass
         else:
+            if ARCHIVE_JOURNAL_ENABLED and event_type in ARCHIVE_JOURNAL_TYPES:
+                journal_archive_event(details)
             try:
                 await target_channel.send(embed=embed)
             except Exception:
@@ -677,61 +1465,717 @@ async def send_embed_with_expand(target_channel: discord.abc.GuildChannel | disc
         pass
 
 # ------------------------
-# Infraction index & scan-state
+# In-memory archive index
 # ------------------------
-async def load_infraction_index(lookback: int = 5000):
-    global known_infraction_codes, known_infraction_msgids
+# Filled once at startup by load_archive_index() and kept current by every archive write.
+ARCHIVE_INDEXED_TYPES = ("infract", "ticket", "ia_case", "antiping", "promote")
+# Singleton records: only the newest one of each type matters
+ARCHIVE_SINGLETON_TYPES = ("bot_status", "staff_positions", "ticket_ui", "infraction_scan_state", "sequences")
+
+archive_index: Dict[str, Dict[int, Dict[str, Any]]] = {t: {} for t in ARCHIVE_INDEXED_TYPES}
+archive_singletons: Dict[str, tuple] = {}  # event_type -> (archive message id, record)
+# Pinned manifest: singleton event_type -> archive message id of the live record
+archive_manifest: Dict[str, int] = {}
+
+def _index_archive_record(archive_msg_id: int, details: Dict[str, Any]):
+    """Apply one parsed archive record to the in-memory index"""
+    if not archive_msg_id or not isinstance(details, dict):
+        return
+    evt = details.get("event_type")
+    if evt in archive_index:
+        previous = archive_index[evt].get(archive_msg_id)
+        if evt == TICKET_ARCHIVE_TYPE:
+            _update_ticket_aggregates(archive_msg_id, previous, details)
+        _update_staff_profiles(previous, details)
+        archive_index[evt][archive_msg_id] = copy.deepcopy(details)
+        if evt == "infract":
+            code = details.get("code")
+            if code:
+                known_infraction_codes.add(str(code))
+            mid = details.get("infraction_message_id")
+            if mid:
+                try:
+                    known_infraction_msgids.add(int(mid))
+                except Exception:
+                    pass
+        if evt == "ticket":
+            _cache_ticket_state(archive_msg_id, archive_index[evt][archive_msg_id])
+        if evt in USER_INDEXED_TYPES:
+            _index_user_record(archive_msg_id, details)
+        if evt in ("infract", "ia_case"):
+            _index_search_document(archive_msg_id, details)
+    elif evt in ARCHIVE_SINGLETON_TYPES:
+        pinned = archive_manifest.get(evt)
+        if pinned:
+            if archive_msg_id == pinned:
+                archive_singletons[evt] = (archive_msg_id, copy.deepcopy(details))
+            return
+        current = archive_singletons.get(evt)
+        if not current or archive_msg_id >= current[0]:
+            archive_singletons[evt] = (archive_msg_id, copy.deepcopy(details))
+
+# ------------------------
+# Per-user archive index
+# ------------------------
+# user id -> event_type -> archive message ids (ascending), kept current by every archive write
+USER_INDEXED_TYPES = ("infract", "promote", "ia_case")
+
+user_archive_index: Dict[int, Dict[str, List[int]]] = {}
+_user_index_owner: Dict[int, tuple] = {}  # archive msg id -> (user id, event_type)
+
+def _unindex_user_record(archive_msg_id: int):
+    owner = _user_index_owner.pop(archive_msg_id, None)
+    if not owner:
+        return
+    ids = user_archive_index.get(owner[0], {}).get(owner[1], [])
+    pos = bisect.bisect_left(ids, archive_msg_id)
+    if pos < len(ids) and ids[pos] == archive_msg_id:
+        ids.pop(pos)
+
+def _index_user_record(archive_msg_id: int, details: Dict[str, Any]):
+    uid = record_user_id(details)
+    owner = (uid, details.get("event_type"))
+    if _user_index_owner.get(archive_msg_id) == owner:
+        return
+    _unindex_user_record(archive_msg_id)
+    if not uid:
+        return
+    ids = user_archive_index.setdefault(uid, {}).setdefault(owner[1], [])
+    bisect.insort(ids, archive_msg_id)
+    _user_index_owner[archive_msg_id] = owner
+
+def user_record_count(user_id: int, event_type: str) -> int:
+    return len(user_archive_index.get(user_id, {}).get(event_type, []))
+
+def user_records_page(user_id: int, event_type: str, before: Optional[int] = None, limit: int = 10) -> tuple:
+    """Return ([(archive id, record)] newest first, has_more) for records older than `before`"""
+    ids = user_archive_index.get(user_id, {}).get(event_type, [])
+    end = bisect.bisect_left(ids, before) if before else len(ids)
+    start = max(0, end - limit)
+    items = []
+    for aid in reversed(ids[start:end]):
+        rec = archive_index.get(event_type, {}).get(aid)
+        if rec is not None:
+            items.append((aid, rec))
+    return items, start > 0
+
+# ------------------------
+# Materialized ticket aggregates
+# ------------------------
+# Totals, per-type and per-claimer counts, close durations and daily/ISO-weekly rollups over
+# every ticket record. Each ticket write applies (new contribution - old contribution).
+ticket_aggregates: Dict[str, Any] = {}
+
+def _reset_ticket_aggregates():
+    ticket_aggregates.clear()
+    ticket_aggregates.update({
+        "total": 0, "open": 0, "closed": 0, "duration_sum": 0.0, "duration_n": 0,
+        "types": {}, "claimers": {}, "day": {}, "week": {},
+    })
+
+_reset_ticket_aggregates()
+
+def record_time(details: Dict[str, Any], field: str) -> Optional[datetime]:
+    """A record timestamp, from its epoch <field>_ts when migrated, else parsed from the string"""
+    ts = details.get(f"{field}_ts")
+    if isinstance(ts, (int, float)) and not isinstance(ts, bool):
+        return datetime.fromtimestamp(ts, tz=timezone.utc)
+    value = details.get(field)
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(str(value).replace(" UTC", "+00:00"))
+    except Exception:
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+def _ticket_contribution(archive_msg_id: int, details: Dict[str, Any]) -> List[tuple]:
+    """(path, amount) pairs one ticket record adds to ticket_aggregates"""
+    closed = details.get("status", "closed") != "open"
+    out: List[tuple] = [
+        (("total",), 1),
+        (("closed",) if closed else ("open",), 1),
+        (("types", details.get("ticket_type", "other")), 1),
+    ]
+    for claimer_id in details.get("claimers", []) or []:
+        out.append((("claimers", claimer_id), 1))
+    opened_dt = record_time(details, "created_at") or discord.utils.snowflake_time(archive_msg_id)
+    out.append((("day", opened_dt.strftime("%Y-%m-%d"), "opened"), 1))
+    out.append((("week", opened_dt.strftime("%G-W%V"), "opened"), 1))
+    closed_dt = record_time(details, "closed_at") if closed else None
+    if closed_dt:
+        seconds = (closed_dt - opened_dt).total_seconds()
+        out.append((("duration_sum",), seconds))
+        out.append((("duration_n",), 1))
+        for bucket, key in (("day", closed_dt.strftime("%Y-%m-%d")), ("week", closed_dt.strftime("%G-W%V"))):
+            out.append(((bucket, key, "closed"), 1))
+            out.append(((bucket, key, "duration_sum"), seconds))
+    return out
+
+def _apply_ticket_contribution(contribution: List[tuple], sign: int):
+    for path, amount in contribution:
+        node = ticket_aggregates
+        for key in path[:-1]:
+            node = node.setdefault(key, {})
+        node[path[-1]] = node.get(path[-1], 0) + sign * amount
+
+def _update_ticket_aggregates(archive_msg_id: int, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]):
+    if old:
+        _apply_ticket_contribution(_ticket_contribution(archive_msg_id, old), -1)
+    if new:
+        _apply_ticket_contribution(_ticket_contribution(archive_msg_id, new), 1)
+
+# ------------------------
+# Materialized staff profiles
+# ------------------------
+# member id -> activity counters, maintained the same way as ticket_aggregates. Actors are
+# matched by exact id (issued_by_id / promoted_by_id, or the id parsed out of older records).
+staff_profiles: Dict[int, Dict[str, int]] = {}
+
+def _staff_contribution(details: Dict[str, Any]) -> List[tuple]:
+    """(member id, counter) pairs one archive record adds to staff_profiles"""
+    evt = details.get("event_type")
+    out: List[tuple] = []
+    def add(uid: Optional[int], counter: str):
+        if uid:
+            out.append((uid, counter))
+    if evt == "infract":
+        add(record_user_id(details), "infractions_received")
+        add(actor_id(details, "issued_by"), "infractions_issued")
+    elif evt == "promote":
+        add(record_user_id(details), "promotions_received")
+        add(actor_id(details, "promoted_by"), "promotions_issued")
+    elif evt == TICKET_ARCHIVE_TYPE:
+        for cid in set(details.get("claimers", []) or []):
+            try:
+                add(int(cid), "tickets_claimed")
+            except Exception:
+                continue
+    elif evt == "ia_case":
+        add(actor_id(details, "investigated"), "ia_investigated")
+        add(actor_id(details, "opened_by"), "ia_opened")
+        for cid in set(details.get("claimers", []) or []):
+            try:
+                add(int(cid), "ia_claimed")
+            except Exception:
+                continue
+    return out
+
+def _update_staff_profiles(old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]):
+    for details, sign in ((old, -1), (new, 1)):
+        if not details:
+            continue
+        for uid, counter in _staff_contribution(details):
+            profile = staff_profiles.setdefault(uid, {})
+            profile[counter] = profile.get(counter, 0) + sign
+
+# ------------------------
+# Search documents
+# ------------------------
+# Infractions and IA cases are indexed on every write; tickets when they close (with transcript).
+def _index_search_document(archive_msg_id: int, details: Dict[str, Any], transcript: str = ""):
+    doc = search_document(details, transcript)
+    if not doc:
+        return
+    try:
+        search_index.add(archive_msg_id, *doc)
+    except Exception:
+        logger.exception(f"Failed to index search document {archive_msg_id}")
+
+# ------------------------
+# Ticket state cache
+# ------------------------
+# channel_id -> {"archive_msg_id": int, "details": dict} for every open ticket, so button
+# clicks resolve state without REST reads.
+ticket_state_cache: Dict[int, Dict[str, Any]] = {}
+
+def _cache_ticket_state(archive_msg_id: int, details: Dict[str, Any]):
+    try:
+        channel_id = int(details.get("channel_id"))
+    except Exception:
+        return
+    current = ticket_state_cache.get(channel_id)
+    if current and current["archive_msg_id"] > archive_msg_id:
+        return
+    if details.get("status") == "closed":
+        ticket_state_cache.pop(channel_id, None)
+        return
+    ticket_state_cache[channel_id] = {"archive_msg_id": archive_msg_id, "details": details}
+
+def resolve_ticket_state(channel_id: int, archive_msg_id: Optional[int] = None) -> tuple:
+    """Return (archive message id, ticket record copy) from local state only"""
+    if archive_msg_id:
+        archive_msg_id = resolve_archive_id(archive_msg_id)
+        rec = archive_index["ticket"].get(archive_msg_id)
+        if rec:
+            return archive_msg_id, copy.deepcopy(rec)
+    entry = ticket_state_cache.get(channel_id)
+    if entry:
+        return entry["archive_msg_id"], copy.deepcopy(entry["details"])
+    try:
+        rows = archive_store.query("ticket", channel_id=channel_id, limit=1)
+    except Exception:
+        rows = []
+    if rows:
+        return rows[0]
+    return archive_msg_id, None
+
+def _forget_archive_record(archive_msg_id: int):
+    """Drop a record that no longer exists in the archive from every local index"""
+    try:
+        archive_store.delete(archive_msg_id)
+    except Exception:
+        logger.exception(f"Failed to drop archive record {archive_msg_id}")
+    previous_ticket = archive_index[TICKET_ARCHIVE_TYPE].get(archive_msg_id)
+    if previous_ticket:
+        _update_ticket_aggregates(archive_msg_id, previous_ticket, None)
+    for records in archive_index.values():
+        previous = records.pop(archive_msg_id, None)
+        if previous:
+            _update_staff_profiles(previous, None)
+    _unindex_user_record(archive_msg_id)
+    try:
+        search_index.remove(archive_msg_id)
+    except Exception:
+        logger.exception(f"Failed to drop search document {archive_msg_id}")
+    for channel_id, entry in list(ticket_state_cache.items()):
+        if entry["archive_msg_id"] == archive_msg_id:
+            ticket_state_cache.pop(channel_id, None)
+    for evt, (aid, _) in list(archive_singletons.items()):
+        if aid == archive_msg_id:
+            archive_singletons.pop(evt, None)
+    _pending_archive_edits.pop(archive_msg_id, None)
+    invalidate_archive_read(archive_msg_id)
+
+def get_archive_singleton(event_type: str) -> tuple:
+    """Return (archive message id, record) for a singleton type, or (None, None)"""
+    return archive_singletons.get(event_type) or (None, None)
+
+def _restore_anti_ping_map():
+    latest: Dict[int, tuple] = {}
+    for aid, rec in archive_index[ANTIPING_ARCHIVE_TYPE].items():
+        try:
+            uid = int(rec.get("user_id"))
+        except Exception:
+            continue
+        if uid not in latest or aid > latest[uid][0]:
+            latest[uid] = (aid, rec)
+    for uid, (aid, rec) in latest.items():
+        if rec.get("status") != "active" or _antiping_is_expired(rec):
+            continue
+        anti_ping_map[uid] = {
+            "archive_msg_id": aid,
+            "status": "active",
+            "started_at": rec.get("started_at"),
+            "duration_hours": rec.get("duration_hours"),
+            "expires_at": rec.get("expires_at"),
+        }
+
+async def load_archive_index():
+    """Single startup pass: fetch new archive messages once, then index every record type"""
+    global _archive_state_ready
+    await load_archive_manifest()
+    # Queued writes go first (replay needs the routes above); anything below may write to the archive
+    try:
+        load_archive_outbox()
+        start_outbox_replay()
+    except Exception:
+        logger.exception("Failed to load the archive outbox")
+    await sync_archive_store()
+    if not await restore_archive_snapshot():
+        _rebuild_archive_index()
+    _archive_state_ready = True
+    await _reconcile_archive_manifest()
+
+def _rebuild_archive_index():
+    """Index every record in the local store from scratch"""
+    for t in ARCHIVE_INDEXED_TYPES:
+        archive_index[t].clear()
+    user_archive_index.clear()
+    _user_index_owner.clear()
+    _reset_ticket_aggregates()
+    staff_profiles.clear()
+    archive_singletons.clear()
+    ticket_state_cache.clear()
+    try:
+        for t in ARCHIVE_INDEXED_TYPES + ARCHIVE_SINGLETON_TYPES:
+            for aid, rec in archive_store.query(t):
+                _index_archive_record(aid, rec)
+        _restore_anti_ping_map()
+        _fold_cold_tier()
+        logger.info("Archive index loaded: " + ", ".join(f"{t}={len(archive_index[t])}" for t in ARCHIVE_INDEXED_TYPES))
+    except Exception:
+        logger.exception("Failed to load archive index")
+
+# ------------------------
+# Warm-start snapshot
+# ------------------------
+# The derived state below is checkpointed on shutdown and every ARCHIVE_SNAPSHOT_INTERVAL.
+# At startup it is loaded and only store rows written after its revision are replayed; if the
+# store no longer matches it (rebuilt, or records gone since) the index is rebuilt instead.
+# The file is gzipped JSON: a header line with the format, the store generation it was taken
+# from and a SHA-256 of the body, then the body.
+# Int-keyed dicts, tuples and sets are tagged so they come back with the same types.
+ARCHIVE_SNAPSHOT_FORMAT = 2
+ARCHIVE_SNAPSHOT_INTERVAL = 600  # seconds
+
+_archive_state_ready = False  # never checkpoint before the index has been loaded
+_snapshot_mark: Optional[tuple] = None
+_archive_snapshot_task: Optional[asyncio.Task] = None
+
+def _archive_state_mark() -> tuple:
+    # Tiering drops records without a store write, so the index size is part of the mark
+    return (archive_store.revision, sum(len(records) for records in archive_index.values()))
+
+def _archive_snapshot_state() -> Dict[str, Any]:
+    """Point-in-time copy of the derived state, cheap enough to take on the event loop.
+
+    Indexed records are replaced rather than mutated, so their containers are copied shallowly;
+    the counters and id lists that are updated in place are copied deeply.
+    """
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "revision": archive_store.revision,
+        "head_id": archive_store.head_id(),
+        "archive_index": {t: dict(records) for t, records in archive_index.items()},
+        "archive_singletons": dict(archive_singletons),
+        "user_archive_index": copy.deepcopy(user_archive_index),
+        "user_index_owner": dict(_user_index_owner),
+        "ticket_aggregates": copy.deepcopy(ticket_aggregates),
+        "staff_profiles": copy.deepcopy(staff_profiles),
+        "ticket_state_cache": {cid: dict(entry) for cid, entry in ticket_state_cache.items()},
+        "known_infraction_codes": set(known_infraction_codes),
+        "known_infraction_msgids": set(known_infraction_msgids),
+    }
+
+def _snapshot_encode(value: Any) -> Any:
+    if isinstance(value, dict):
+        if all(isinstance(k, str) for k in value):
+            return {k: _snapshot_encode(v) for k, v in value.items()}
+        return {"__pairs__": [[_snapshot_encode(k), _snapshot_encode(v)] for k, v in value.items()]}
+    if isinstance(value, tuple):
+        return {"__tuple__": [_snapshot_encode(v) for v in value]}
+    if isinstance(value, (set, frozenset)):
+        return {"__set__": [_snapshot_encode(v) for v in value]}
+    if isinstance(value, list):
+        return [_snapshot_encode(v) for v in value]
+    return value
+
+def _snapshot_decode(value: Any) -> Any:
+    if isinstance(value, list):
+        return [_snapshot_decode(v) for v in value]
+    if not isinstance(value, dict):
+        return value
+    if len(value) == 1:
+        if "__pairs__" in value:
+            return {_snapshot_decode(k): _snapshot_decode(v) for k, v in value["__pairs__"]}
+        if "__tuple__" in value:
+            return tuple(_snapshot_decode(v) for v in value["__tuple__"])
+        if "__set__" in value:
+            return {_snapshot_decode(v) for v in value["__set__"]}
+    return {k: _snapshot_decode(v) for k, v in value.items()}
+
+def _write_snapshot_file(state: Dict[str, Any], generation: str):
+    body = json.dumps(_snapshot_encode(state), separators=(",", ":")).encode("utf-8")
+    header = json.dumps({
+        "format": ARCHIVE_SNAPSHOT_FORMAT,
+        "generation": generation,
+        "sha256": hashlib.sha256(body).hexdigest(),
+    }).encode("utf-8")
+    tmp_path = ARCHIVE_SNAPSHOT_PATH + ".tmp"
+    with gzip.open(tmp_path, "wb", compresslevel=6) as f:
+        f.write(header + b"\n" + body)
+    os.replace(tmp_path, ARCHIVE_SNAPSHOT_PATH)
+
+def _read_snapshot_file(generation: str) -> Optional[Dict[str, Any]]:
+    """The decoded snapshot, or None when it is missing, from another format or store, or corrupt"""
+    try:
+        with gzip.open(ARCHIVE_SNAPSHOT_PATH, "rb") as f:
+            raw = f.read()
+    except FileNotFoundError:
+        return None
+    header_line, _, body = raw.partition(b"\n")
+    header = json.loads(header_line)
+    if header.get("format") != ARCHIVE_SNAPSHOT_FORMAT:
+        logger.info("Archive snapshot is from another format, rebuilding the index")
+        return None
+    if header.get("generation") != generation:
+        logger.info("Archive store was rebuilt since the snapshot, rebuilding the index")
+        return None
+    if hashlib.sha256(body).hexdigest() != header.get("sha256"):
+        logger.warning("Archive snapshot checksum mismatch, rebuilding the index")
+        return None
+    return _snapshot_decode(json.loads(body))
+
+async def write_archive_snapshot(force: bool = True) -> bool:
+    """Checkpoint the derived archive state to ARCHIVE_SNAPSHOT_PATH"""
+    global _snapshot_mark
+    if not _archive_state_ready:
+        return False
+    mark = _archive_state_mark()
+    if not force and mark == _snapshot_mark:
+        return False
+    try:
+        # Copied in one step so the state and its revision match; encoding and I/O run off the loop
+        state = _archive_snapshot_state()
+        await asyncio.to_thread(_write_snapshot_file, state, archive_store.generation)
+        _snapshot_mark = mark
+        return True
+    except Exception:
+        logger.exception("Failed to write archive snapshot")
+        return False
+
+async def restore_archive_snapshot() -> bool:
+    """Load the snapshot and replay newer store rows; False means a full rebuild is needed"""
+    try:
+        snapshot = await asyncio.to_thread(_read_snapshot_file, archive_store.generation)
+    except Exception:
+        logger.exception("Failed to read archive snapshot")
+        return False
+    if snapshot is None:
+        return False
+    try:
+        if snapshot.get("schema_version") != SCHEMA_VERSION:
+            logger.info("Archive snapshot is from another schema version, rebuilding the index")
+            return False
+        if archive_store.revision < snapshot["revision"]:
+            logger.info("Archive store is older than the snapshot, rebuilding the index")
+            return False
+        live_ids = archive_store.ids()
+        head = snapshot.get("head_id")
+        if head and head not in live_ids:
+            logger.info("Archive snapshot head is gone from the store, rebuilding the index")
+            return False
+        for records in snapshot["archive_index"].values():
+            if not live_ids.issuperset(records):
+                logger.info("Archive snapshot holds records the store no longer has, rebuilding the index")
+                return False
+        for t in ARCHIVE_INDEXED_TYPES:
+            archive_index[t].clear()
+            archive_index[t].update(snapshot["archive_index"].get(t) or {})
+        for target, key in (
+            (archive_singletons, "archive_singletons"),
+            (user_archive_index, "user_archive_index"),
+            (_user_index_owner, "user_index_owner"),
+            (ticket_aggregates, "ticket_aggregates"),
+            (staff_profiles, "staff_profiles"),
+            (ticket_state_cache, "ticket_state_cache"),
+        ):
+            target.clear()
+            target.update(snapshot[key])
+        known_infraction_codes.update(snapshot["known_infraction_codes"])
+        known_infraction_msgids.update(snapshot["known_infraction_msgids"])
+        replayed = 0
+        for aid, rec in archive_store.changed_since(snapshot["revision"]):
+            _index_archive_record(aid, rec)
+            replayed += 1
+        _restore_anti_ping_map()
+        logger.info(f"Archive index restored from snapshot: replayed {replayed} newer records")
+        return True
+    except Exception:
+        logger.exception("Failed to restore archive snapshot")
+        return False
+
+async def archive_snapshot_loop():
+    await bot.wait_until_ready()
+    while not bot.is_closed():
+        await asyncio.sleep(ARCHIVE_SNAPSHOT_INTERVAL)
+        await write_archive_snapshot(force=False)
+
+def start_archive_snapshots():
+    global _archive_snapshot_task
+    if _archive_snapshot_task is None or _archive_snapshot_task.done():
+        _archive_snapshot_task = asyncio.create_task(archive_snapshot_loop())
+
+# ------------------------
+# Archive manifest (pinned message mapping singleton types to their record)
+# ------------------------
+MANIFEST_ARCHIVE_TYPE = "archive_manifest"
+_manifest_msg_id: Optional[int] = None
+_manifest_lock = asyncio.Lock()
+
+async def load_archive_manifest():
+    """Read the pinned manifest with one pins() call"""
+    global _manifest_msg_id
     arch_ch = await ensure_channel(MOD_ARCHIVE_CHANNEL_ID)
     if not arch_ch:
         return
     try:
-        async for m in arch_ch.history(limit=lookback):
-            parsed = _extract_json_from_codeblock(m.content or "")
-            if not parsed:
-                continue
-            if parsed.get("event_type") == "infract":
-                code = parsed.get("code")
-                if code:
-                    known_infraction_codes.add(str(code))
-                mid = parsed.get("infraction_message_id")
-                if mid:
+        for m in await arch_ch.pins():
+            parsed = decode_record_if(m.content or "", (MANIFEST_ARCHIVE_TYPE,))
+            if parsed:
+                archive_manifest.clear()
+                for evt, aid in (parsed.get("entries") or {}).items():
                     try:
-                        known_infraction_msgids.add(int(mid))
+                        archive_manifest[evt] = int(aid)
                     except Exception:
-                        pass
+                        continue
+                archive_routes.clear()
+                for evt, tid in (parsed.get("routes") or {}).items():
+                    try:
+                        archive_routes[evt] = int(tid)
+                    except Exception:
+                        continue
+                _manifest_msg_id = m.id
+                break
+    except Exception:
+        logger.exception("Failed to load archive manifest")
+
+async def _save_archive_manifest():
+    global _manifest_msg_id
+    record = {
+        "event_type": MANIFEST_ARCHIVE_TYPE,
+        "entries": dict(archive_manifest),
+        "routes": dict(archive_routes),
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+    }
+    if _manifest_msg_id and await edit_archive_message(_manifest_msg_id, record, immediate=True):
+        return
+    aid = await archive_details_to_mod_channel(record, durable=False)
+    if not aid:
+        return
+    _manifest_msg_id = aid
+    arch_ch = await ensure_channel(MOD_ARCHIVE_CHANNEL_ID)
+    try:
+        msg = await arch_ch.fetch_message(aid)
+        await msg.pin(reason="Archive manifest")
+    except Exception:
+        logger.exception("Failed to pin archive manifest")
+
+async def _reconcile_archive_manifest():
+    """Fetch manifest records missing locally and adopt legacy singletons into the manifest"""
+    changed = False
+    for evt in ARCHIVE_SINGLETON_TYPES:
+        aid = archive_manifest.get(evt)
+        if aid:
+            if evt in archive_singletons:
+                continue
+            try:
+                m = await fetch_archive_message(aid)
+                if not m:
+                    continue
+                parsed = _extract_json_from_codeblock(m.content or "")
+                if parsed:
+                    _mirror_archive_record(aid, parsed)
+            except discord.NotFound:
+                archive_manifest.pop(evt, None)
+                changed = True
+            except Exception:
+                pass
+        elif evt in archive_singletons:
+            archive_manifest[evt] = archive_singletons[evt][0]
+            changed = True
+    if changed:
+        async with _manifest_lock:
+            await _save_archive_manifest()
+
+async def save_singleton(event_type: str, record: Dict[str, Any]) -> Optional[int]:
+    """Edit a singleton record in place, creating it (and its manifest entry) if needed"""
+    aid = archive_manifest.get(event_type) or get_archive_singleton(event_type)[0]
+    if aid and await edit_archive_message(aid, record, immediate=True):
+        new_aid = aid
+    else:
+        new_aid = await archive_details_to_mod_channel(record, durable=False)
+        if not new_aid:
+            return None
+    if archive_manifest.get(event_type) != new_aid:
+        archive_manifest[event_type] = new_aid
+        archive_singletons[event_type] = (new_aid, copy.deepcopy(record))
+        async with _manifest_lock:
+            await _save_archive_manifest()
+    return new_aid
+
+# ------------------------
+# Sequence allocator (IA case numbers, infraction codes)
+# ------------------------
+SEQUENCE_ARCHIVE_TYPE = "sequences"
+INFRACTION_CODE_START = 1000
+
+_sequence_values: Dict[str, int] = {}
+_sequence_lock = asyncio.Lock()
+_sequence_save_lock = asyncio.Lock()
+_sequence_save_tasks: Set[asyncio.Task] = set()  # referenced until done, so a save is never collected mid-write
+
+def load_sequences():
+    """Seed sequences from the archive record and the index (no history walk)"""
+    _, rec = get_archive_singleton(SEQUENCE_ARCHIVE_TYPE)
+    stored = (rec or {}).get("sequences") or {}
+    case_max = 0
+    for parsed in archive_index["ia_case"].values():
+        try:
+            case_max = max(case_max, int(parsed.get("case_number", 0)))
+        except Exception:
+            continue
+    _sequence_values["ia_case"] = max(int(stored.get("ia_case", 0)), case_max, _sequence_values.get("ia_case", 0))
+    _sequence_values["infraction_code"] = max(int(stored.get("infraction_code", 0)), _sequence_values.get("infraction_code", 0))
+
+async def _save_sequences():
+    async with _sequence_save_lock:
+        record = {
+            "event_type": SEQUENCE_ARCHIVE_TYPE,
+            "sequences": dict(_sequence_values),
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        }
+        try:
+            await save_singleton(SEQUENCE_ARCHIVE_TYPE, record)
+        except Exception:
+            logger.exception("Failed to save sequences")
+
+async def allocate_sequence(name: str) -> int:
+    """Hand out the next value of a persisted sequence; safe under concurrent callers"""
+    async with _sequence_lock:
+        value = _sequence_values.get(name, 0) + 1
+        if name == "infraction_code":
+            # Codes must never collide with anything already archived or imported
+            value = max(value, INFRACTION_CODE_START)
+            while str(value) in known_infraction_codes:
+                value += 1
+            known_infraction_codes.add(str(value))
+        _sequence_values[name] = value
+    # The save always writes the latest values, so overlapping saves cannot move a sequence back
+    task = asyncio.create_task(_save_sequences())
+    _sequence_save_tasks.add(task)
+    task.add_done_callback(_sequence_save_tasks.discard)
+    return value
+
+# ------------------------
+# Infraction index & scan-state
+# ------------------------
+async def load_infraction_index(lookback: int = 5000):
+    try:
+        for parsed in archive_index["infract"].values():
+            code = parsed.get("code")
+            if code:
+                known_infraction_codes.add(str(code))
+            mid = parsed.get("infraction_message_id")
+            if mid:
+                try:
+                    known_infraction_msgids.add(int(mid))
+                except Exception:
+                    pass
     except Exception:
         logger.exception("Failed to build infraction index")
 
 async def load_scan_state():
     global _scan_state_archive_id, _last_scan_dt
-    arch_ch = await ensure_channel(MOD_ARCHIVE_CHANNEL_ID)
-    if not arch_ch:
+    aid, parsed = get_archive_singleton("infraction_scan_state")
+    if not parsed:
         return
     try:
-        async for m in arch_ch.history(limit=1000):
-            parsed = _extract_json_from_codeblock(m.content or "")
-            if parsed and parsed.get("event_type") == "infraction_scan_state":
-                try:
-                    last = parsed.get("last_scanned_at")
-                    if last:
-                        _last_scan_dt = datetime.fromisoformat(last)
-                except Exception:
-                    _last_scan_dt = None
-                _scan_state_archive_id = m.id
-                break
+        last = parsed.get("last_scanned_at")
+        if last:
+            _last_scan_dt = datetime.fromisoformat(last)
     except Exception:
-        logger.exception("Failed to load scan state")
+        _last_scan_dt = None
+    _scan_state_archive_id = aid
 
 async def save_scan_state(dt: datetime):
     global _scan_state_archive_id
     entry = {"event_type": "infraction_scan_state", "last_scanned_at": dt.isoformat()}
     try:
-        if _scan_state_archive_id:
-            await edit_archive_message(_scan_state_archive_id, entry)
-        else:
-            aid = await archive_details_to_mod_channel(entry)
-            if aid:
-                _scan_state_archive_id = aid
+        aid = await save_singleton("infraction_scan_state", entry)
+        if aid:
+            _scan_state_archive_id = aid
     except Exception:
         logger.exception("Failed to save scan state")
 
@@ -741,6 +2185,7 @@ async def save_scan_state(dt: datetime):
 BATCH_SIZE = 200
 BATCH_SLEEP = 0.25
 SCAN_INTERVAL_SECONDS = 300
+RAW_CONTENT_MAX = 1000  # characters of the scanned message kept in the record, well inside one archive message
 
 async def scan_batch(limit: int = BATCH_SIZE) -> Dict[str, int]:
     global _last_scan_dt
@@ -829,7 +2274,7 @@ async def scan_batch(limit: int = BATCH_SIZE) -> Dict[str, int]:
                     "infraction_message_id": msg.id,
                     "event_type": "infract",
                     "attachments": [a.url for a in msg.attachments] if msg.attachments else [],
-                    "extra": {"raw_content": content[:2000]},
+                    "extra": {"raw_content": content[:RAW_CONTENT_MAX]},
                 }
 
         if not parsed_infraction:
@@ -855,6 +2300,7 @@ async def scan_batch(limit: int = BATCH_SIZE) -> Dict[str, int]:
             "punishment": parsed_infraction.get("punishment"),
             "reason": parsed_infraction.get("reason"),
             "issued_by": parsed_infraction.get("issued_by"),
+            "issued_by_id": actor_id(parsed_infraction, "issued_by"),
             "expires": parsed_infraction.get("expires"),
             "timestamp": parsed_infraction.get("timestamp"),
             "infraction_message_id": parsed_infraction.get("infraction_message_id"),
@@ -957,19 +2403,10 @@ async def update_staff_positions_embed():
             return
         
         # Get or find the staff positions message from archive
-        archive_ch = await ensure_channel(MOD_ARCHIVE_CHANNEL_ID)
         message_id = None
-        archive_msg_id = None
-        if archive_ch:
-            try:
-                async for m in archive_ch.history(limit=1000):
-                    parsed = _extract_json_from_codeblock(m.content or "")
-                    if parsed and parsed.get("event_type") == STAFF_POSITIONS_ARCHIVE_TYPE:
-                        message_id = parsed.get("message_id")
-                        archive_msg_id = m.id
-                        break
-            except Exception:
-                pass
+        _, staff_record = get_archive_singleton(STAFF_POSITIONS_ARCHIVE_TYPE)
+        if staff_record:
+            message_id = staff_record.get("message_id")
         
         # Count members for each role
         role_counts = {}
@@ -1042,13 +2479,11 @@ async def update_staff_positions_embed():
                 logger.info("Updated staff positions embed")
                 
                 # Update archive timestamp
-                if archive_ch and archive_msg_id:
+                if staff_record:
                     try:
-                        archive_msg = await archive_ch.fetch_message(archive_msg_id)
-                        parsed = _extract_json_from_codeblock(archive_msg.content or "")
-                        if parsed:
-                            parsed["updated_at"] = datetime.now(timezone.utc).isoformat()
-                            await edit_archive_message(archive_msg_id, parsed)
+                        parsed = dict(staff_record)
+                        parsed["updated_at"] = datetime.now(timezone.utc).isoformat()
+                        await save_singleton(STAFF_POSITIONS_ARCHIVE_TYPE, parsed)
                     except Exception:
                         pass
                 return
@@ -1065,15 +2500,14 @@ async def update_staff_positions_embed():
                 message_id = msg.id
                 
                 # Save to archive
-                if archive_ch:
-                    archive_data = {
-                        "event_type": STAFF_POSITIONS_ARCHIVE_TYPE,
-                        "message_id": message_id,
-                        "channel_id": FAQ_CHANNEL_ID,
-                        "created_at": datetime.now(timezone.utc).isoformat(),
-                        "updated_at": datetime.now(timezone.utc).isoformat(),
-                    }
-                    await archive_details_to_mod_channel(archive_data)
+                archive_data = {
+                    "event_type": STAFF_POSITIONS_ARCHIVE_TYPE,
+                    "message_id": message_id,
+                    "channel_id": FAQ_CHANNEL_ID,
+                    "created_at": datetime.now(timezone.utc).isoformat(),
+                    "updated_at": datetime.now(timezone.utc).isoformat(),
+                }
+                await save_singleton(STAFF_POSITIONS_ARCHIVE_TYPE, archive_data)
                 logger.info("Created new staff positions embed")
             except Exception as e:
                 logger.exception(f"Failed to create staff positions embed: {e}")
@@ -1085,25 +2519,11 @@ async def update_staff_positions_embed():
 # Anti-ping persistence helpers
 # ------------------------
 async def _save_antiping_entry(parsed: Dict[str, Any]) -> Optional[int]:
-    arch_ch = await ensure_channel(MOD_ARCHIVE_CHANNEL_ID)
-    if not arch_ch:
-        return None
-    try:
-        content = json.dumps(parsed, default=str, ensure_ascii=False, indent=2)
-    except Exception:
-        content = json.dumps({k: str(v) for k, v in parsed.items()}, ensure_ascii=False, indent=2)
-    payload = f"```json\n{content}\n```"
     try:
         aid = parsed.get("_archive_msg_id")
-        if aid:
-            try:
-                msg = await arch_ch.fetch_message(int(aid))
-                await msg.edit(content=payload)
-                return msg.id
-            except Exception:
-                pass
-        newm = await arch_ch.send(content=payload)
-        return newm.id
+        if aid and await edit_archive_message(int(aid), parsed, immediate=True):
+            return int(aid)
+        return await archive_details_to_mod_channel(parsed)
     except Exception:
         logger.exception("Failed to save antiping archive entry")
         return None
@@ -1150,19 +2570,10 @@ async def ensure_ticket_ui_messages():
         logger.warning("Support channel not available for ticket UI creation.")
         return
 
-    archive_ch = await ensure_channel(MOD_ARCHIVE_CHANNEL_ID)
     existing_ui = {}
-    archive_msg_id = None
-    if archive_ch:
-        try:
-            async for m in archive_ch.history(limit=1000):
-                parsed = _extract_json_from_codeblock(m.content or "")
-                if parsed and parsed.get("event_type") == TICKET_UI_ARCHIVE_TYPE:
-                    existing_ui = parsed.get("ui", {}) or {}
-                    archive_msg_id = m.id
-                    break
-        except Exception:
-            pass
+    _, parsed = get_archive_singleton(TICKET_UI_ARCHIVE_TYPE)
+    if parsed:
+        existing_ui = parsed.get("ui", {}) or {}
 
     ui_map = dict(existing_ui)
     changed = False
@@ -1189,17 +2600,14 @@ async def ensure_ticket_ui_messages():
             except Exception:
                 logger.exception(f"Failed to send ticket UI for {tkey}")
 
-    if changed and archive_ch:
+    if changed:
         record = {
             "event_type": TICKET_UI_ARCHIVE_TYPE,
             "ui": ui_map,
             "created_at": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC"),
         }
         try:
-            if archive_msg_id:
-                await edit_archive_message(archive_msg_id, record)
-            else:
-                await archive_details_to_mod_channel(record)
+            await save_singleton(TICKET_UI_ARCHIVE_TYPE, record)
         except Exception:
             pass
 
@@ -1239,6 +2647,8 @@ async def create_ticket_channel_for(user: discord.Member, ticket_type: str, open
     except Exception:
         logger.exception("Failed to create ticket channel")
         return None, None
+    # Spooled from the first message on, so the count is known without reading the file
+    start_ticket_transcript(chan.id)
 
     conf = TICKET_TYPES[ticket_type]
     role_ping = conf.get("role_ping")
@@ -1289,29 +2699,200 @@ async def create_ticket_channel_for(user: discord.Member, ticket_type: str, open
 
     return chan, archive_msg_id
 
-async def collect_ticket_history(channel: discord.TextChannel) -> str:
-    """Collect full message history from ticket channel"""
+def _transcript_lines(msg: discord.Message) -> List[str]:
+    timestamp = msg.created_at.strftime("%Y-%m-%d %H:%M:%S UTC")
+    author = f"{msg.author.display_name} ({msg.author.id})"
+    content = msg.content or "[No text content]"
+    lines = [f"[{timestamp}] {author}: {content}"]
+    if msg.embeds:
+        for idx, embed in enumerate(msg.embeds):
+            lines.append(f"  └─ Embed {idx+1}: {embed.title or 'No title'} - {embed.description or 'No description'}")
+    if msg.attachments:
+        for att in msg.attachments:
+            lines.append(f"  └─ Attachment: {att.url}")
+    return lines
+
+async def collect_ticket_history(channel: discord.TextChannel) -> tuple:
+    """Collect full message history from ticket channel as (text, message count)"""
     history_lines = []
+    count = 0
     try:
         async for msg in channel.history(limit=None, oldest_first=True):
-            timestamp = msg.created_at.strftime("%Y-%m-%d %H:%M:%S UTC")
-            author = f"{msg.author.display_name} ({msg.author.id})"
-            content = msg.content or "[No text content]"
-            
-            history_lines.append(f"[{timestamp}] {author}: {content}")
-            
-            if msg.embeds:
-                for idx, embed in enumerate(msg.embeds):
-                    history_lines.append(f"  └─ Embed {idx+1}: {embed.title or 'No title'} - {embed.description or 'No description'}")
-            
-            if msg.attachments:
-                for att in msg.attachments:
-                    history_lines.append(f"  └─ Attachment: {att.url}")
+            history_lines.extend(_transcript_lines(msg))
+            count += 1
     except Exception as e:
         logger.exception("Failed to collect ticket history")
         history_lines.append(f"[ERROR] Failed to collect complete history: {e}")
     
-    return "\n".join(history_lines)
+    return "\n".join(history_lines), count
+
+# ------------------------
+# Ticket transcript spool
+# ------------------------
+# Every message in a ticket opened by the bot is appended to a per-channel spool file as it
+# arrives, so closing a ticket needs no history walk. The message count sits next to the spool
+# (<id>.count) so it survives restarts; a channel without one was opened before the spool
+# existed and falls back to collect_ticket_history(). Lines are buffered per ticket and appended
+# by one writer task per channel, off the event loop.
+TRANSCRIPT_SPOOL_DIR = os.environ.get("TRANSCRIPT_SPOOL_DIR", "transcripts")
+
+_transcript_counts: Dict[int, int] = {}  # channel id -> messages spooled
+_unspooled_channels: Set[int] = set()  # ticket channels opened before the spool, checked once
+_transcript_pending: Dict[int, List[str]] = {}  # channel id -> lines not written yet
+_transcript_writers: Dict[int, asyncio.Task] = {}
+
+def _transcript_path(channel_id: int) -> str:
+    return os.path.join(TRANSCRIPT_SPOOL_DIR, f"{channel_id}.log")
+
+def _transcript_count_path(channel_id: int) -> str:
+    return os.path.join(TRANSCRIPT_SPOOL_DIR, f"{channel_id}.count")
+
+def _spooled_message_count(channel_id: int) -> Optional[int]:
+    """Messages spooled for a channel, or None when it isn't spooled"""
+    if channel_id in _transcript_counts:
+        return _transcript_counts[channel_id]
+    try:
+        with open(_transcript_count_path(channel_id), "r", encoding="utf-8") as f:
+            count = int(f.read().strip() or 0)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        logger.exception(f"Failed to read transcript count for {channel_id}")
+        return None
+    _transcript_counts[channel_id] = count
+    return count
+
+def _write_transcript_count(channel_id: int, count: int):
+    os.makedirs(TRANSCRIPT_SPOOL_DIR, exist_ok=True)
+    with open(_transcript_count_path(channel_id), "w", encoding="utf-8") as f:
+        f.write(str(count))
+    _transcript_counts[channel_id] = count
+
+def start_ticket_transcript(channel_id: int):
+    """Begin spooling a freshly created ticket channel"""
+    try:
+        _write_transcript_count(channel_id, 0)
+    except Exception:
+        logger.exception(f"Failed to start transcript spool for {channel_id}")
+
+def spool_ticket_message(message: discord.Message):
+    """Queue one ticket message for its channel's transcript spool"""
+    ch = message.channel
+    if not isinstance(ch, discord.TextChannel) or ch.category_id != TICKET_CATEGORY_ID:
+        return
+    if ch.id in _unspooled_channels:
+        return
+    count = _spooled_message_count(ch.id)
+    if count is None:
+        # Not spooled from the start; the close falls back to the history walk
+        _unspooled_channels.add(ch.id)
+        return
+    _transcript_counts[ch.id] = count + 1
+    _transcript_pending.setdefault(ch.id, []).append("\n".join(_transcript_lines(message)) + "\n")
+    writer = _transcript_writers.get(ch.id)
+    if writer is None or writer.done():
+        _transcript_writers[ch.id] = asyncio.create_task(_write_transcript_spool(ch.id))
+
+def _append_transcript_chunk(channel_id: int, text: str, count: int):
+    with open(_transcript_path(channel_id), "a", encoding="utf-8") as f:
+        f.write(text)
+    with open(_transcript_count_path(channel_id), "w", encoding="utf-8") as f:
+        f.write(str(count))
+
+async def _write_transcript_spool(channel_id: int):
+    while _transcript_pending.get(channel_id):
+        # Taken together with the count, so the count file always matches the lines on disk
+        chunk = "".join(_transcript_pending.pop(channel_id))
+        count = _transcript_counts.get(channel_id, 0)
+        try:
+            await asyncio.to_thread(_append_transcript_chunk, channel_id, chunk, count)
+        except Exception:
+            logger.exception(f"Failed to spool transcript lines for {channel_id}")
+
+def _read_transcript_spool(channel_id: int) -> str:
+    try:
+        with open(_transcript_path(channel_id), "r", encoding="utf-8") as f:
+            return f.read().rstrip("\n")
+    except FileNotFoundError:
+        return ""
+
+async def load_ticket_transcript(channel: discord.TextChannel) -> tuple:
+    """Return (transcript text, message count), from the spool when there is one"""
+    count = _spooled_message_count(channel.id)
+    if count is not None:
+        try:
+            # Let the channel's one writer put everything queued so far on disk
+            while True:
+                writer = _transcript_writers.get(channel.id)
+                if writer is not None and not writer.done():
+                    await writer
+                elif _transcript_pending.get(channel.id):
+                    _transcript_writers[channel.id] = asyncio.create_task(_write_transcript_spool(channel.id))
+                else:
+                    break
+            return await asyncio.to_thread(_read_transcript_spool, channel.id), _transcript_counts.get(channel.id, count)
+        except Exception:
+            logger.exception(f"Failed to read transcript spool for {channel.id}")
+    return await collect_ticket_history(channel)
+
+def discard_ticket_transcript(channel_id: int):
+    _transcript_counts.pop(channel_id, None)
+    _transcript_pending.pop(channel_id, None)
+    _unspooled_channels.discard(channel_id)
+    writer = _transcript_writers.pop(channel_id, None)
+    if writer is not None and not writer.done():
+        # A chunk is being appended right now: remove the files once it is on disk
+        writer.add_done_callback(lambda _: _remove_transcript_files(channel_id))
+        return
+    _remove_transcript_files(channel_id)
+
+def _remove_transcript_files(channel_id: int):
+    for path in (_transcript_path(channel_id), _transcript_count_path(channel_id)):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except Exception:
+            logger.exception(f"Failed to remove transcript spool {path}")
+
+def prune_transcript_spools():
+    """Drop spools left behind by ticket channels that no longer exist"""
+    try:
+        names = os.listdir(TRANSCRIPT_SPOOL_DIR)
+    except FileNotFoundError:
+        return
+    except Exception:
+        logger.exception("Failed to list transcript spools")
+        return
+    stale = set()
+    for name in names:
+        stem, _, ext = name.partition(".")
+        if ext not in ("log", "count") or not stem.isdigit():
+            continue
+        if bot.get_channel(int(stem)) is None:
+            stale.add(int(stem))
+    for channel_id in stale:
+        discard_ticket_transcript(channel_id)
+    if stale:
+        logger.info(f"Removed {len(stale)} orphaned transcript spool(s)")
+
+async def resolve_transcript_url(details: Dict[str, Any]) -> Optional[str]:
+    """Fresh download URL for a closed ticket's transcript (attachment URLs are signed and expire)"""
+    msg_id = details.get("transcript_message_id")
+    if not msg_id:
+        return None
+    ch = await ensure_channel(details.get("transcript_channel_id") or TICKET_LOGS_CHANNEL_ID)
+    if not ch:
+        return None
+    try:
+        msg = await ch.fetch_message(int(msg_id))
+    except Exception:
+        return None
+    return msg.attachments[0].url if msg.attachments else None
+
+def compressed_transcript_file(channel_name: str, text: str) -> discord.File:
+    data = gzip.compress(text.encode("utf-8"))
+    return discord.File(io.BytesIO(data), filename=f"{channel_name}-transcript.txt.gz")
 
 # ------------------------
 # Modals
@@ -1410,50 +2991,29 @@ class CloseReasonModal(discord.ui.Modal, title="Close Ticket Reason"):
                 pass
             return
 
-        details = None
-        archive_id = self.archive_id
-        arch_ch = await ensure_channel(MOD_ARCHIVE_CHANNEL_ID)
-        archive_msg = None
-        if archive_id and arch_ch:
-            try:
-                archive_msg = await arch_ch.fetch_message(archive_id)
-                details = _extract_json_from_codeblock(archive_msg.content or "")
-            except Exception:
-                details = None
-
-        if not details:
-            arch_ch = await ensure_channel(MOD_ARCHIVE_CHANNEL_ID)
-            if arch_ch:
-                try:
-                    async for m in arch_ch.history(limit=2000):
-                        p = _extract_json_from_codeblock(m.content or "")
-                        if p and p.get("event_type") == TICKET_ARCHIVE_TYPE and p.get("channel_id") == chan.id:
-                            details = p
-                            archive_id = m.id
-                            break
-                except Exception:
-                    pass
-
+        archive_id, details = resolve_ticket_state(chan.id, self.archive_id)
         details = details or {}
         
-        # Collect full message history
-        full_history = await collect_ticket_history(chan)
+        # Transcript and message count come from the spool, not a history walk
+        full_history, msg_count = await load_ticket_transcript(chan)
         
         details["status"] = "closed"
         details["close_reason"] = reason_text
         details["closed_at"] = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
-        details["message_history"] = full_history
+        details["message_count"] = msg_count
         try:
             requester = interaction.client.get_user(self.requester_id) or await interaction.client.fetch_user(self.requester_id)
             details["closed_by"] = f"{requester} ({self.requester_id})"
         except Exception:
             details["closed_by"] = f"{self.requester_id}"
+        details["closed_by_id"] = self.requester_id
 
         if archive_id:
             try:
                 await edit_archive_message(archive_id, details)
             except Exception:
                 pass
+            _index_search_document(archive_id, details, full_history)
 
         try:
             await chan.set_permissions(chan.guild.default_role, view_channel=True, send_messages=False)
@@ -1499,7 +3059,7 @@ class CloseReasonModal(discord.ui.Modal, title="Close Ticket Reason"):
                 embed.add_field(name="Close Reason", value=details.get("close_reason", "No reason provided"), inline=False)
                 
                 # Add note about full summary in archive
-                archive_note = f"Full ticket summary with message history saved to archive (ID: {archive_id})" if archive_id else "Full summary saved to archive"
+                archive_note = f"Full ticket summary saved to archive (ID: {archive_id}); transcript attached to the summary" if archive_id else "Full summary saved to archive"
                 embed.set_footer(text=archive_note)
                 
                 await logs_ch.send(embed=embed)
@@ -1549,17 +3109,11 @@ class CloseReasonModal(discord.ui.Modal, title="Close Ticket Reason"):
                     summary_embed.add_field(name="Claimers", value="None", inline=False)
                 
                 # Message Count
-                try:
-                    msg_count = len([m async for m in chan.history(limit=None)])
-                    summary_embed.add_field(name="Total Messages", value=str(msg_count), inline=True)
-                except Exception:
-                    summary_embed.add_field(name="Total Messages", value="Unknown", inline=True)
+                summary_embed.add_field(name="Total Messages", value=str(msg_count), inline=True)
                 
                 # Duration
                 try:
-                    opened_dt = datetime.fromisoformat(details.get("created_at", "").replace(" UTC", "+00:00"))
-                    closed_dt = datetime.fromisoformat(details.get("closed_at", "").replace(" UTC", "+00:00"))
-                    duration = closed_dt - opened_dt
+                    duration = record_time(details, "closed_at") - record_time(details, "created_at")
                     hours = int(duration.total_seconds() / 3600)
                     minutes = int((duration.total_seconds() % 3600) / 60)
                     summary_embed.add_field(name="Duration", value=f"{hours}h {minutes}m", inline=True)
@@ -1574,11 +3128,17 @@ class CloseReasonModal(discord.ui.Modal, title="Close Ticket Reason"):
                 # Archive reference
                 if archive_id:
                     summary_embed.add_field(name="Archive ID", value=str(archive_id), inline=True)
-                    summary_embed.add_field(name="Full History", value=f"Complete message history saved to archive", inline=False)
+                summary_embed.add_field(name="Full History", value="Compressed transcript attached", inline=False)
                 
                 summary_embed.set_footer(text=f"Ticket ID: {archive_id or 'N/A'}")
                 
-                await logs_ch.send(embed=summary_embed)
+                summary_msg = await logs_ch.send(embed=summary_embed, file=compressed_transcript_file(chan.name, full_history))
+                if summary_msg.attachments:
+                    details["transcript_message_id"] = summary_msg.id
+                    details["transcript_channel_id"] = logs_ch.id
+                    if archive_id:
+                        await edit_archive_message(archive_id, details)
+                discard_ticket_transcript(chan.id)
         except Exception:
             logger.exception("Failed to send ticket summary to logs")
 
@@ -1605,15 +3165,7 @@ class ClaimApprovalView(discord.ui.View):
     @discord.ui.button(label="Approve", style=SUCCESS_BUTTON_STYLE)
     async def approve(self, interaction: discord.Interaction, button: discord.ui.Button):
         # Load ticket details
-        details = None
-        if self.archive_id:
-            arch_ch = await ensure_channel(MOD_ARCHIVE_CHANNEL_ID)
-            if arch_ch:
-                try:
-                    am = await arch_ch.fetch_message(self.archive_id)
-                    details = _extract_json_from_codeblock(am.content or "")
-                except Exception:
-                    pass
+        _, details = resolve_ticket_state(self.channel_id, self.archive_id)
         
         if details:
             claimers = details.get("claimers", []) or []
@@ -1676,20 +3228,16 @@ class CloseApprovalView(discord.ui.View):
             pass
         
         # Store approval in archive so requester can close
-        if self.archive_id:
-            arch_ch = await ensure_channel(MOD_ARCHIVE_CHANNEL_ID)
-            if arch_ch:
-                try:
-                    am = await arch_ch.fetch_message(self.archive_id)
-                    details = _extract_json_from_codeblock(am.content or "")
-                    if details:
-                        approved_closers = details.get("approved_closers", []) or []
-                        if self.requester_id not in approved_closers:
-                            approved_closers.append(self.requester_id)
-                            details["approved_closers"] = approved_closers
-                            await edit_archive_message(self.archive_id, details)
-                except Exception:
-                    pass
+        archive_id, details = resolve_ticket_state(self.channel_id, self.archive_id)
+        if archive_id and details:
+            try:
+                approved_closers = details.get("approved_closers", []) or []
+                if self.requester_id not in approved_closers:
+                    approved_closers.append(self.requester_id)
+                    details["approved_closers"] = approved_closers
+                    await edit_archive_message(archive_id, details)
+            except Exception:
+                pass
         
         # Notify requester
         chan = bot.get_channel(self.channel_id)
@@ -1740,15 +3288,7 @@ class InactivityActionView(discord.ui.View):
     @discord.ui.button(label="Keep Open", style=SUCCESS_BUTTON_STYLE, custom_id="inactivity_keep")
     async def keep_open(self, interaction: discord.Interaction, button: discord.ui.Button):
         # Check if user is a claimer
-        details = None
-        if self.archive_id:
-            arch_ch = await ensure_channel(MOD_ARCHIVE_CHANNEL_ID)
-            if arch_ch:
-                try:
-                    am = await arch_ch.fetch_message(self.archive_id)
-                    details = _extract_json_from_codeblock(am.content or "")
-                except Exception:
-                    pass
+        _, details = resolve_ticket_state(self.channel_id, self.archive_id)
         
         if details:
             claimers = details.get("claimers", []) or []
@@ -1778,15 +3318,7 @@ class InactivityActionView(discord.ui.View):
     @discord.ui.button(label="Close Ticket", style=discord.ButtonStyle.danger, custom_id="inactivity_close")
     async def close_ticket(self, interaction: discord.Interaction, button: discord.ui.Button):
         # Check if user is a claimer
-        details = None
-        if self.archive_id:
-            arch_ch = await ensure_channel(MOD_ARCHIVE_CHANNEL_ID)
-            if arch_ch:
-                try:
-                    am = await arch_ch.fetch_message(self.archive_id)
-                    details = _extract_json_from_codeblock(am.content or "")
-                except Exception:
-                    pass
+        _, details = resolve_ticket_state(self.channel_id, self.archive_id)
         
         if details:
             claimers = details.get("claimers", []) or []
@@ -1915,29 +3447,12 @@ INACTIVITY_THRESHOLD_HOURS = 24
 INACTIVITY_REPEAT_HOURS = 24
 
 async def _check_ticket_inactivity_once():
-    arch_ch = await ensure_channel(MOD_ARCHIVE_CHANNEL_ID)
-    if not arch_ch:
-        return
     now = datetime.now(timezone.utc)
     try:
-        async for m in arch_ch.history(limit=2000):
-            parsed = _extract_json_from_codeblock(m.content or "")
-            if not parsed:
-                continue
-            if parsed.get("event_type") != TICKET_ARCHIVE_TYPE:
-                continue
-            if parsed.get("status") != "open":
-                continue
+        for archive_msg_id, parsed in archive_store.query(TICKET_ARCHIVE_TYPE, status="open"):
             channel_id = parsed.get("channel_id")
             opener_id = parsed.get("opener_id")
-            archive_msg_id = m.id
-            inactivity_pinged_str = parsed.get("inactivity_pinged_at")
-            inactivity_pinged_at = None
-            if inactivity_pinged_str:
-                try:
-                    inactivity_pinged_at = datetime.fromisoformat(inactivity_pinged_str)
-                except Exception:
-                    inactivity_pinged_at = None
+            inactivity_pinged_at = record_time(parsed, "inactivity_pinged_at")
 
             try:
                 chan = bot.get_channel(channel_id) or await bot.fetch_channel(channel_id)
@@ -1955,11 +3470,7 @@ async def _check_ticket_inactivity_once():
                 if last_msg:
                     last_time = last_msg.created_at.replace(tzinfo=timezone.utc) if last_msg.created_at.tzinfo is None else last_msg.created_at.astimezone(timezone.utc)
                 else:
-                    created_at_str = parsed.get("created_at")
-                    try:
-                        last_time = datetime.fromisoformat(created_at_str) if created_at_str else datetime.now(timezone.utc)
-                    except Exception:
-                        last_time = datetime.now(timezone.utc)
+                    last_time = record_time(parsed, "created_at") or datetime.now(timezone.utc)
             except Exception:
                 continue
 
@@ -2016,14 +3527,439 @@ async def ticket_inactivity_loop():
     await bot.wait_until_ready()
     while not bot.is_closed():
         try:
-            await _check_ticket_inactivity_once()
+            await _check_ticket_inactivity_once()
+        except Exception:
+            logger.exception("ticket_inactivity_loop error")
+        await asyncio.sleep(1800)  # Check every 30 minutes
+
+# ------------------------
+# Archive compaction
+# ------------------------
+ARCHIVE_COMPACTION_INTERVAL = 6 * 3600  # seconds between runs
+ARCHIVE_COMPACTION_BATCH = 100  # max stale messages removed per run
+ARCHIVE_COMPACTION_DELETE_SLEEP = 1.0
+COMPACTION_SNAPSHOT_TYPE = "compaction_snapshot"
+COMPACTION_SNAPSHOTS_KEPT = 10  # older compaction snapshots are compacted themselves
+# Last stale id a run reached: the next run starts after it, so records that can be neither
+# deleted nor tombstoned rotate to the back instead of blocking every batch
+COMPACTION_CURSOR_KEY = "compaction_cursor"
+TOMBSTONE_ARCHIVE_TYPE = "tombstone"
+# Log-style records: one per source message, anything beyond that is a duplicate
+ARCHIVE_LOG_TYPES = ("message_trigger", "slash_command")
+
+# Archive messages the bot is deleting itself (skipped by the deletion monitor)
+_archive_self_deletes: Set[int] = set()
+
+def _find_stale_archive_records() -> List[tuple]:
+    """Return (archive message id, event_type) for superseded or duplicate records"""
+    stale: List[tuple] = []
+
+    # Singletons: only the live record (per the manifest) is kept
+    for evt in ARCHIVE_SINGLETON_TYPES + (MANIFEST_ARCHIVE_TYPE,):
+        live = _manifest_msg_id if evt == MANIFEST_ARCHIVE_TYPE else (archive_manifest.get(evt) or get_archive_singleton(evt)[0])
+        if not live:
+            continue
+        for aid, _ in archive_store.query(evt):
+            if aid != live:
+                stale.append((aid, evt))
+
+    # Anti-ping: a newer record for the same user supersedes every older one
+    seen_users: Set[int] = set()
+    for aid, rec in archive_store.query(ANTIPING_ARCHIVE_TYPE):
+        uid = rec.get("user_id")
+        if uid in seen_users:
+            stale.append((aid, ANTIPING_ARCHIVE_TYPE))
+        elif uid is not None:
+            seen_users.add(uid)
+
+    # Compaction snapshots: only the newest few are kept
+    for aid, _ in archive_store.query(COMPACTION_SNAPSHOT_TYPE)[COMPACTION_SNAPSHOTS_KEPT:]:
+        stale.append((aid, COMPACTION_SNAPSHOT_TYPE))
+
+    # Log records: duplicates of the same source message / invocation
+    for evt in ARCHIVE_LOG_TYPES:
+        seen_keys: Set[Any] = set()
+        for aid, rec in archive_store.query(evt):
+            key = _log_record_key(rec)
+            if key in seen_keys:
+                stale.append((aid, evt))
+            else:
+                seen_keys.add(key)
+
+    # Oldest first, so repeated runs work through the backlog in order
+    stale.sort()
+    return stale
+
+def _log_record_key(rec: Dict[str, Any]) -> Any:
+    # Unique per event; records logged before interaction_id existed fall back to every field they carry
+    if rec.get("message_id"):
+        return ("message", rec["message_id"])
+    if rec.get("interaction_id"):
+        return ("interaction", rec["interaction_id"])
+    return (rec.get("user_id"), rec.get("command"), rec.get("params"), rec.get("timestamp"))
+
+def _find_duplicate_journal_lines() -> Dict[int, Set[int]]:
+    """Journal message id -> lines repeating a log record already archived elsewhere"""
+    duplicates: Dict[int, Set[int]] = {}
+    for evt in ARCHIVE_LOG_TYPES:
+        seen_keys: Set[Any] = {_log_record_key(rec) for _, rec in archive_store.query(evt)}
+        for aid, seq, rec in archive_store.query_journal(evt):
+            key = _log_record_key(rec)
+            if key in seen_keys:
+                duplicates.setdefault(aid, set()).add(seq)
+            else:
+                seen_keys.add(key)
+    return duplicates
+
+def _rotate_from_cursor(items: List[tuple]) -> List[tuple]:
+    cursor = int(archive_store.get_meta(COMPACTION_CURSOR_KEY) or -1)
+    return [i for i in items if i[0] > cursor] + [i for i in items if i[0] <= cursor]
+
+async def _compact_journal_lines(archive_msg_id: int, duplicate_seqs: Set[int]) -> bool:
+    """Rewrite a journal message without its duplicate lines (or delete it if none are left)"""
+    kept = [rec for seq, rec in _journal_message_records(archive_msg_id) if seq not in duplicate_seqs]
+    if kept:
+        if not await _write_archive_edit(archive_msg_id, encode_journal(kept)):
+            return False
+        archive_store.upsert_journal(archive_msg_id, kept, location=archive_store.location(archive_msg_id))
+        return True
+    _archive_self_deletes.add(archive_msg_id)
+    try:
+        arch_ch = await archive_channel_for_record(archive_msg_id)
+        if arch_ch:
+            await arch_ch.get_partial_message(archive_msg_id).delete()
+    except discord.NotFound:
+        pass
+    except Exception:
+        _archive_self_deletes.discard(archive_msg_id)
+        return False
+    archive_store.delete(archive_msg_id)
+    return True
+
+def _journal_message_records(archive_msg_id: int) -> List[tuple]:
+    return [(seq, rec) for aid, seq, rec in archive_store.query_journal(min_id=archive_msg_id, max_id=archive_msg_id + 1)]
+
+async def compact_archive() -> Dict[str, int]:
+    """Delete (or tombstone) stale archive records and record what was removed"""
+    stale = _rotate_from_cursor(_find_stale_archive_records())[:ARCHIVE_COMPACTION_BATCH]
+    journal_budget = ARCHIVE_COMPACTION_BATCH - len(stale)
+    journal_dupes = _rotate_from_cursor(sorted(_find_duplicate_journal_lines().items()))[:journal_budget]
+    if not stale and not journal_dupes:
+        return {}
+
+    removed: Dict[str, int] = {}
+    for _, evt in stale:
+        removed[evt] = removed.get(evt, 0) + 1
+    if journal_dupes:
+        removed["journal_lines"] = sum(len(seqs) for _, seqs in journal_dupes)
+    touched = [aid for aid, _ in stale] + [aid for aid, _ in journal_dupes]
+    snapshot = {
+        "event_type": COMPACTION_SNAPSHOT_TYPE,
+        "compacted_at": datetime.now(timezone.utc).isoformat(),
+        "removed": removed,
+        "first_id": min(touched),
+        "last_id": max(touched),
+    }
+    # Snapshot first, so the archive always says what a compaction removed
+    if not await archive_details_to_mod_channel(snapshot, durable=False):
+        return {}
+
+    deleted = tombstoned = failed = 0
+    _archive_self_deletes.clear()
+    for aid, evt in stale:
+        _archive_self_deletes.add(aid)
+        try:
+            arch_ch = await archive_channel_for_record(aid)
+            if not arch_ch:
+                _archive_self_deletes.discard(aid)
+                continue
+            await arch_ch.get_partial_message(aid).delete()
+            deleted += 1
+        except discord.NotFound:
+            pass
+        except Exception:
+            _archive_self_deletes.discard(aid)
+            tombstone = {"event_type": TOMBSTONE_ARCHIVE_TYPE, "superseded_type": evt}
+            if not await edit_archive_message(aid, tombstone, immediate=True):
+                failed += 1
+                continue
+            tombstoned += 1
+        _forget_archive_record(aid)
+        await asyncio.sleep(ARCHIVE_COMPACTION_DELETE_SLEEP)
+
+    rewritten = 0
+    for aid, seqs in journal_dupes:
+        if await _compact_journal_lines(aid, seqs):
+            rewritten += 1
+        else:
+            failed += 1
+        await asyncio.sleep(ARCHIVE_COMPACTION_DELETE_SLEEP)
+
+    archive_store.set_meta(COMPACTION_CURSOR_KEY, max(touched))
+    logger.info(
+        f"Archive compaction: removed={removed} deleted={deleted} tombstoned={tombstoned} "
+        f"journals={rewritten} failed={failed}"
+    )
+    return {"deleted": deleted, "tombstoned": tombstoned, "journals": rewritten, "failed": failed}
+
+# ------------------------
+# Schema migration
+# ------------------------
+# Rewrites legacy records to SCHEMA_VERSION in place, oldest first, one edit every
+# ARCHIVE_MIGRATION_DELAY seconds. Only records below SCHEMA_VERSION are read (singletons and
+# the manifest are rewritten by their owners anyway). Progress is kept in the store, so restarts resume.
+ARCHIVE_MIGRATION_DELAY = 2.0
+MIGRATION_CURSOR_KEY = "schema_migration_cursor"
+
+_schema_migration_task: Optional[asyncio.Task] = None
+
+async def migrate_archive_schema():
+    cursor = int(archive_store.get_meta(MIGRATION_CURSOR_KEY) or -1)
+    migrated = failed = 0
+    legacy = archive_store.iter_all(
+        after=cursor, below_version=SCHEMA_VERSION, exclude_types=ARCHIVE_SINGLETON_TYPES + (MANIFEST_ARCHIVE_TYPE,)
+    )
+    for aid, _, rec in legacy:
+        upgraded = copy.deepcopy(rec)
+        normalize_record(upgraded)
+        if await edit_archive_message(aid, upgraded, immediate=True):
+            migrated += 1
+        else:
+            # Not ours to edit (or gone); readers still fall back to the string fields
+            failed += 1
+        archive_store.set_meta(MIGRATION_CURSOR_KEY, aid)
+        await asyncio.sleep(ARCHIVE_MIGRATION_DELAY)
+    if migrated or failed:
+        logger.info(f"Archive schema migration: migrated={migrated} skipped={failed}")
+
+def start_schema_migration():
+    global _schema_migration_task
+    if _schema_migration_task is None or _schema_migration_task.done():
+        _schema_migration_task = asyncio.create_task(migrate_archive_schema())
+
+_archive_compaction_task: Optional[asyncio.Task] = None
+
+def start_archive_compaction():
+    global _archive_compaction_task
+    if _archive_compaction_task is None or _archive_compaction_task.done():
+        _archive_compaction_task = asyncio.create_task(archive_compaction_loop())
+
+async def archive_compaction_loop():
+    await bot.wait_until_ready()
+    while not bot.is_closed():
+        try:
+            await compact_archive()
+            await tier_archive_records()
+        except Exception:
+            logger.exception("archive_compaction_loop error")
+        await asyncio.sleep(ARCHIVE_COMPACTION_INTERVAL)
+
+# ------------------------
+# Retention tiering (hot store -> cold files)
+# ------------------------
+# Records past their window leave the hot store (and the in-memory index) for compressed,
+# month-partitioned files. The Discord archive keeps them; /archive query reads the cold tier
+# when its since= window reaches back that far, and the ticket/staff aggregates still count them.
+# The move runs in a worker thread on its own SQLite connection: rows are appended cold first and
+# then deleted hot, so a crash in between leaves a duplicate that the cold readers collapse.
+RETENTION_DAY = 86400
+ANTIPING_TERMINAL_STATUSES = ("stopped",)
+# event_type -> (age in seconds, condition a record must meet to leave the hot store)
+ARCHIVE_RETENTION: Dict[str, tuple] = {
+    TICKET_ARCHIVE_TYPE: (90 * RETENTION_DAY, lambda r: r.get("status") == "closed"),
+    # Only stopped entries (by hand or on expiry) are final; paused ones can still be started again
+    ANTIPING_ARCHIVE_TYPE: (30 * RETENTION_DAY, lambda r: r.get("status") in ANTIPING_TERMINAL_STATUSES),
+    "message_trigger": (14 * RETENTION_DAY, lambda r: True),
+    "slash_command": (14 * RETENTION_DAY, lambda r: True),
+}
+
+def _demote_archive_record(archive_msg_id: int):
+    """Drop a tiered record from the in-memory index only; aggregates and search keep counting it"""
+    for records in archive_index.values():
+        records.pop(archive_msg_id, None)
+    for channel_id, entry in list(ticket_state_cache.items()):
+        if entry["archive_msg_id"] == archive_msg_id:
+            ticket_state_cache.pop(channel_id, None)
+    invalidate_archive_read(archive_msg_id)
+
+def _tier_cold_rows(skip: set, max_revision: int) -> tuple:
+    """Worker-thread half of tiering; returns (record ids moved, journal records moved)"""
+    store = ArchiveStore(ARCHIVE_DB_PATH)
+    moved: List[int] = []
+    journal_moved = 0
+    try:
+        for evt, (max_age, may_leave) in ARCHIVE_RETENTION.items():
+            cutoff = discord.utils.time_snowflake(datetime.now(timezone.utc) - timedelta(seconds=max_age))
+            rows = [
+                (aid, None, rec)
+                for aid, rec in store.query(evt, max_id=cutoff)
+                if may_leave(rec) and aid not in skip
+            ]
+            if rows:
+                try:
+                    cold_tier.append(rows)
+                except Exception:
+                    logger.exception(f"Failed to write cold tier for {evt}")
+                else:
+                    moved.extend(store.demote(evt, [aid for aid, _, _ in rows], max_revision))
+            # Journal records leave one by one; a journal message may still hold records of other types
+            packed = [
+                (aid, seq, rec)
+                for aid, seq, rec in store.query_journal(evt, max_id=cutoff)
+                if may_leave(rec) and aid not in skip
+            ]
+            if packed:
+                try:
+                    cold_tier.append(packed)
+                except Exception:
+                    logger.exception(f"Failed to write cold tier for journal {evt}")
+                else:
+                    store.delete_journal_rows([(aid, seq) for aid, seq, _ in packed])
+                    journal_moved += len(packed)
+    finally:
+        store.close()
+    return moved, journal_moved
+
+async def tier_archive_records() -> int:
+    """Move hot records past their retention window into the cold tier"""
+    # Never move the newest record of a location (the sync resumes from it) or one with a write pending
+    skip = {archive_store.head_id(MOD_ARCHIVE_CHANNEL_ID, include_unset=True)}
+    skip.update(archive_store.head_id(tid) for tid in archive_routes.values())
+    skip.update(_pending_archive_edits)
+    moved, journal_moved = await asyncio.to_thread(_tier_cold_rows, skip, archive_store.revision)
+    for aid in moved:
+        _demote_archive_record(aid)
+    total = len(moved) + journal_moved
+    if total:
+        logger.info(f"Archive tiering: moved {total} records to {ARCHIVE_COLD_DIR}")
+    return total
+
+def _reheat_cold_record(archive_msg_id: int):
+    """A tiered record was written again: take its cold copy out so nothing counts it twice"""
+    evt = archive_store.cold_event_type(archive_msg_id)
+    if not evt:
+        return
+    archive_store.forget_cold(archive_msg_id)
+
+    async def _discard():
+        try:
+            old = await asyncio.to_thread(cold_tier.discard, evt, archive_msg_id)
         except Exception:
-            logger.exception("ticket_inactivity_loop error")
-        await asyncio.sleep(1800)  # Check every 30 minutes
+            logger.exception(f"Failed to remove cold copy of {archive_msg_id}")
+            return
+        # The hot copy is indexed as new, so the folded-in cold contribution comes back out
+        if old and evt == TICKET_ARCHIVE_TYPE:
+            _update_ticket_aggregates(archive_msg_id, old, None)
+            _update_staff_profiles(old, None)
+
+    asyncio.get_running_loop().create_task(_discard())
+
+def _fold_cold_tier():
+    """Add cold ticket records to the materialized aggregates so stats cover the full history"""
+    try:
+        for aid, rec in cold_tier.iter_records(TICKET_ARCHIVE_TYPE):
+            if aid in archive_index[TICKET_ARCHIVE_TYPE]:
+                continue
+            _update_ticket_aggregates(aid, None, rec)
+            _update_staff_profiles(None, rec)
+    except Exception:
+        logger.exception("Failed to fold cold tier into aggregates")
 
 # ------------------------
 # Slash command groups
 # ------------------------
+LOOKUP_PAGE_SIZE = 10
+
+def _infraction_lookup_embed(staff: discord.Member, items: List[tuple], total: int, first_no: int) -> discord.Embed:
+    embed = discord.Embed(title="Infraction Lookup", color=discord.Color.orange())
+    embed.set_thumbnail(url=staff.display_avatar.url if getattr(staff, "display_avatar", None) else None)
+    embed.add_field(name="Staff Member", value=f"{staff} • {staff.id}", inline=False)
+    embed.add_field(name="Total Infractions Found", value=str(total), inline=False)
+    for n, (archive_id, item) in enumerate(items, start=first_no):
+        value = (
+            f"• Code: `{item.get('code', 'N/A')}`\n"
+            f"• Punishment: {item.get('punishment', 'N/A')}\n"
+            f"• Reason: {item.get('reason', 'N/A')}\n"
+            f"• Issued By: {item.get('issued_by', 'N/A')}\n"
+            f"• When: {item.get('timestamp', 'N/A')}\n"
+            f"• ArchiveID: `{archive_id}`"
+        )
+        embed.add_field(name=f"Infraction #{n}", value=value[:1024], inline=False)
+    return embed
+
+def _promotion_lookup_embed(staff: discord.Member, items: List[tuple], total: int, first_no: int) -> discord.Embed:
+    embed = discord.Embed(title="Promotion Lookup", color=discord.Color.green())
+    embed.set_thumbnail(url=staff.display_avatar.url if getattr(staff, "display_avatar", None) else None)
+    embed.add_field(name="Staff Member", value=f"{staff} • {staff.id}", inline=False)
+    embed.add_field(name="Total Promotions Found", value=str(total), inline=False)
+    for n, (archive_id, item) in enumerate(items, start=first_no):
+        value = (
+            f"• New Rank: {item.get('new_rank', 'N/A')}\n"
+            f"• Reason: {item.get('reason', 'N/A')}\n"
+            f"• Promoted By: {item.get('promoted_by', 'N/A')}\n"
+            f"• When: {item.get('timestamp', 'N/A')}\n"
+            f"• ArchiveID: `{archive_id}`"
+        )
+        embed.add_field(name=f"Promotion #{n}", value=value[:1024], inline=False)
+    return embed
+
+class ArchiveLookupView(discord.ui.View):
+    """Prev/Next pages over a member's records, served from the per-user index"""
+    def __init__(self, requester_id: int, staff: discord.Member, event_type: str, build_embed):
+        super().__init__(timeout=600)
+        self.requester_id = requester_id
+        self.staff = staff
+        self.event_type = event_type
+        self.build_embed = build_embed
+        self.cursors: List[Optional[int]] = [None]  # "before" cursor of every page visited
+        self.oldest_shown: Optional[int] = None
+        self.message: Optional[discord.Message] = None
+
+    async def on_timeout(self):
+        for item in self.children:
+            item.disabled = True
+        if self.message:
+            try:
+                await self.message.edit(view=self)
+            except Exception:
+                pass
+
+    def render(self) -> discord.Embed:
+        items, has_more = user_records_page(self.staff.id, self.event_type, before=self.cursors[-1], limit=LOOKUP_PAGE_SIZE)
+        total = user_record_count(self.staff.id, self.event_type)
+        page = len(self.cursors)
+        pages = max(1, -(-total // LOOKUP_PAGE_SIZE))
+        self.oldest_shown = items[-1][0] if items else None
+        self.prev_page.disabled = page == 1
+        self.next_page.disabled = not has_more
+        embed = self.build_embed(self.staff, items, total, (page - 1) * LOOKUP_PAGE_SIZE + 1)
+        embed.set_footer(text=f"Page {page}/{pages} • Use Expand on archive messages for full details.")
+        return embed
+
+    async def _turn(self, interaction: discord.Interaction):
+        if interaction.user.id != self.requester_id:
+            try:
+                await interaction.response.send_message("Only the person who ran this lookup can page through it.", ephemeral=True)
+            except Exception:
+                pass
+            return
+        try:
+            await interaction.response.edit_message(embed=self.render(), view=self)
+        except Exception:
+            pass
+
+    @discord.ui.button(label="Prev", style=discord.ButtonStyle.secondary)
+    async def prev_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if len(self.cursors) > 1 and interaction.user.id == self.requester_id:
+            self.cursors.pop()
+        await self._turn(interaction)
+
+    @discord.ui.button(label="Next", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if self.oldest_shown and interaction.user.id == self.requester_id:
+            self.cursors.append(self.oldest_shown)
+        await self._turn(interaction)
+
 class InfractionGroup(app_commands.Group):
     def __init__(self):
         super().__init__(name="infraction", description="Infraction commands (BOD only)")
@@ -2033,71 +3969,13 @@ class InfractionGroup(app_commands.Group):
     @app_commands.describe(staff="Staff member to lookup")
     async def lookup(self, interaction: discord.Interaction, staff: discord.Member):
         await interaction.response.defer(ephemeral=False)
-        archive_ch = await ensure_channel(MOD_ARCHIVE_CHANNEL_ID)
-        if not archive_ch:
-            await interaction.followup.send("Mod archive channel is not available.", ephemeral=True)
-            return
 
-        found: List[Dict[str, Any]] = []
-        lookup_id = getattr(staff, "id", None)
-        try:
-            async for m in archive_ch.history(limit=2000):
-                parsed = _extract_json_from_codeblock(m.content or "")
-                if not parsed:
-                    continue
-                if parsed.get("event_type") != "infract":
-                    continue
-                uid = parsed.get("user_id")
-                if uid:
-                    try:
-                        if int(uid) == int(lookup_id):
-                            parsed["_archive_message_id"] = m.id
-                            found.append(parsed)
-                    except Exception:
-                        if str(lookup_id) in str(parsed.get("user", "")):
-                            parsed["_archive_message_id"] = m.id
-                            found.append(parsed)
-                else:
-                    if str(lookup_id) in str(parsed.get("user", "")):
-                        parsed["_archive_message_id"] = m.id
-                        found.append(parsed)
-        except Exception:
-            pass
-
-        if not found:
+        if not user_record_count(staff.id, "infract"):
             await interaction.followup.send(f"No infractions found for {staff.display_name}.", ephemeral=False)
             return
 
-        embed = discord.Embed(title="Infraction Lookup", color=discord.Color.orange())
-        embed.set_thumbnail(url=staff.display_avatar.url if getattr(staff, "display_avatar", None) else None)
-        embed.add_field(name="Staff Member", value=f"{staff} • {staff.id}", inline=False)
-        embed.add_field(name="Total Infractions Found", value=str(len(found)), inline=False)
-
-        shown = 0
-        for item in found[:10]:
-            shown += 1
-            code = item.get("code", "N/A")
-            punishment = item.get("punishment", "N/A")
-            reason = item.get("reason", "N/A")
-            issued_by = item.get("issued_by", "N/A")
-            ts = item.get("timestamp", "N/A")
-            archive_id = item.get("_archive_message_id", "N/A")
-            value = (
-                f"• Code: `{code}`\n"
-                f"• Punishment: {punishment}\n"
-                f"• Reason: {reason}\n"
-                f"• Issued By: {issued_by}\n"
-                f"• When: {ts}\n"
-                f"• ArchiveID: `{archive_id}`"
-            )
-            embed.add_field(name=f"Infraction #{shown}", value=value, inline=False)
-
-        if len(found) > 10:
-            embed.set_footer(text=f"Showing 10 most recent of {len(found)} infractions.")
-        else:
-            embed.set_footer(text="Use Expand on archive messages for full details.")
-
-        await interaction.followup.send(embed=embed, ephemeral=False)
+        view = ArchiveLookupView(interaction.user.id, staff, "infract", _infraction_lookup_embed)
+        view.message = await interaction.followup.send(embed=view.render(), view=view, ephemeral=False)
 
     @app_commands.command(name="scan", description="Scan old infractions channel and archive missing entries (BOD only)")
     @app_commands.check(is_bod)
@@ -2122,67 +4000,63 @@ class PromotionGroup(app_commands.Group):
     @app_commands.describe(staff="Staff member to lookup promotions for")
     async def lookup(self, interaction: discord.Interaction, staff: discord.Member):
         await interaction.response.defer(ephemeral=False)
-        archive_ch = await ensure_channel(MOD_ARCHIVE_CHANNEL_ID)
-        if not archive_ch:
-            await interaction.followup.send("Mod archive channel is not available.", ephemeral=True)
-            return
-
-        found: List[Dict[str, Any]] = []
-        lookup_id = getattr(staff, "id", None)
-        try:
-            async for m in archive_ch.history(limit=2000):
-                parsed = _extract_json_from_codeblock(m.content or "")
-                if not parsed:
-                    continue
-                if parsed.get("event_type") != "promote":
-                    continue
-                uid = parsed.get("user_id")
-                if uid:
-                    try:
-                        if int(uid) == int(lookup_id):
-                            parsed["_archive_message_id"] = m.id
-                            found.append(parsed)
-                    except Exception:
-                        if str(lookup_id) in str(parsed.get("user", "")):
-                            parsed["_archive_message_id"] = m.id
-                            found.append(parsed)
-                else:
-                    if str(lookup_id) in str(parsed.get("user", "")):
-                        parsed["_archive_message_id"] = m.id
-                        found.append(parsed)
-        except Exception:
-            pass
 
-        if not found:
+        if not user_record_count(staff.id, "promote"):
             await interaction.followup.send(f"No promotions found for {staff.display_name}.", ephemeral=False)
             return
 
-        embed = discord.Embed(title="Promotion Lookup", color=discord.Color.green())
-        embed.set_thumbnail(url=staff.display_avatar.url if getattr(staff, "display_avatar", None) else None)
-        embed.add_field(name="Staff Member", value=f"{staff} • {staff.id}", inline=False)
-        embed.add_field(name="Total Promotions Found", value=str(len(found)), inline=False)
-
-        shown = 0
-        for item in found[:10]:
-            shown += 1
-            new_rank = item.get("new_rank", "N/A")
-            reason = item.get("reason", "N/A")
-            promoted_by = item.get("promoted_by", "N/A")
-            ts = item.get("timestamp", "N/A")
-            archive_id = item.get("_archive_message_id", "N/A")
-            value = (
-                f"• New Rank: {new_rank}\n"
-                f"• Reason: {reason}\n"
-                f"• Promoted By: {promoted_by}\n"
-                f"• When: {ts}\n"
-                f"• ArchiveID: `{archive_id}`"
-            )
-            embed.add_field(name=f"Promotion #{shown}", value=value, inline=False)
+        view = ArchiveLookupView(interaction.user.id, staff, "promote", _promotion_lookup_embed)
+        view.message = await interaction.followup.send(embed=view.render(), view=view, ephemeral=False)
+
+ARCHIVE_QUERY_MAX_ROWS = 10
+ARCHIVE_QUERY_MAX_GROUPS = 20
+
+def _archive_query_line(archive_id: int, rec: Dict[str, Any]) -> str:
+    evt = rec.get("event_type", "?")
+    parts = [f"`{archive_id}` {evt}"]
+    for key in ("user", "code", "punishment", "new_rank", "status", "ticket_type", "case_string", "timestamp"):
+        value = rec.get(key)
+        if value not in (None, "", []):
+            parts.append(f"{key}={value}")
+    return " • ".join(parts)[:200]
 
-        if len(found) > 10:
-            embed.set_footer(text=f"Showing 10 most recent of {len(found)} promotions.")
+class ArchiveGroup(app_commands.Group):
+    def __init__(self):
+        super().__init__(name="archive", description="Archive commands (BOD only)")
 
-        await interaction.followup.send(embed=embed, ephemeral=False)
+    @app_commands.command(name="query", description="Query indexed archive records (BOD only)")
+    @app_commands.check(is_bod)
+    @app_commands.describe(filters="e.g. event=infract issued_by=<id> since=30d group=punishment")
+    async def query(self, interaction: discord.Interaction, filters: str):
+        await interaction.response.defer(ephemeral=True)
+        started = datetime.now(timezone.utc)
+        try:
+            spec = parse_query(filters)
+            rows = archive_store.select(spec, cold=cold_tier)
+        except QueryError as e:
+            await interaction.followup.send(f"Invalid query: {e}", ephemeral=True)
+            return
+        except Exception:
+            logger.exception("Archive query failed")
+            await interaction.followup.send("Archive query failed.", ephemeral=True)
+            return
+        elapsed_ms = (datetime.now(timezone.utc) - started).total_seconds() * 1000
+
+        embed = discord.Embed(title="Archive Query", color=discord.Color.dark_blue())
+        embed.add_field(name="Query", value=f"`{filters}`"[:1024], inline=False)
+        embed.add_field(name="Matches", value=str(len(rows)), inline=True)
+        if spec["group"]:
+            groups = group_counts(rows, spec["group"])
+            lines = [f"{name}: **{count}**" for name, count in groups[:ARCHIVE_QUERY_MAX_GROUPS]]
+            if len(groups) > ARCHIVE_QUERY_MAX_GROUPS:
+                lines.append(f"... {len(groups) - ARCHIVE_QUERY_MAX_GROUPS} more")
+            embed.add_field(name=f"By {spec['group']}", value="\n".join(lines)[:1024] or "None", inline=False)
+        else:
+            shown = rows[:min(spec["limit"] or ARCHIVE_QUERY_MAX_ROWS, ARCHIVE_QUERY_MAX_ROWS)]
+            lines = [_archive_query_line(aid, rec) for aid, rec in shown]
+            embed.add_field(name="Newest matches", value="\n".join(lines)[:1024] or "None", inline=False)
+        embed.set_footer(text=f"Served from the local archive index in {elapsed_ms:.0f} ms")
+        await interaction.followup.send(embed=embed, ephemeral=True)
 
 class IAGroup(app_commands.Group):
     def __init__(self):
@@ -2212,21 +4086,7 @@ class IAGroup(app_commands.Group):
     ):
         await interaction.response.defer(ephemeral=False)
 
-        case_num = 1
-        archive_ch = await ensure_channel(MOD_ARCHIVE_CHANNEL_ID)
-        if archive_ch:
-            try:
-                async for m in archive_ch.history(limit=2000):
-                    parsed = _extract_json_from_codeblock(m.content or "")
-                    if parsed and parsed.get("event_type") == "ia_case":
-                        try:
-                            existing = int(parsed.get("case_number", 0))
-                            if existing >= case_num:
-                                case_num = existing + 1
-                        except Exception:
-                            continue
-            except Exception:
-                pass
+        case_num = await allocate_sequence("ia_case")
 
         case_str = f"{case_num:06d}"
 
@@ -2386,6 +4246,7 @@ class StaffCommands(commands.Cog):
             "new_rank": new_rank,
             "reason": reason,
             "promoted_by": f"{interaction.user} ({interaction.user.id})",
+            "promoted_by_id": interaction.user.id,
             "timestamp": now_str,
             "promotion_message_id": getattr(promotion_message, "id", None),
             "extra": None,
@@ -2408,7 +4269,7 @@ class StaffCommands(commands.Cog):
     @app_commands.check(is_bod)
     @app_commands.describe(user="Staff member", reason="Reason", punishment="Punishment", expires="Optional expiry")
     async def infract(self, interaction: discord.Interaction, user: discord.Member, reason: str, punishment: str, expires: str = "N/A"):
-        code = random.randint(1000, 9999)
+        code = await allocate_sequence("infraction_code")
         embed = discord.Embed(
             title=f"{EMOJI_WARNING} Staff Infraction - Code {code}",
             color=discord.Color.red()
@@ -2436,6 +4297,7 @@ class StaffCommands(commands.Cog):
             "punishment": punishment,
             "reason": reason,
             "issued_by": f"{interaction.user} ({interaction.user.id})",
+            "issued_by_id": interaction.user.id,
             "expires": expires,
             "timestamp": now_str,
             "infraction_message_id": getattr(sent_inf_msg, "id", None),
@@ -2522,6 +4384,33 @@ class StaffCommands(commands.Cog):
             pass
         await interaction.response.send_message(f"Embed sent to {channel.mention}", ephemeral=True)
 
+    @app_commands.command(name="search", description="Search closed tickets, infractions and IA cases")
+    @app_commands.check(is_staff)
+    @app_commands.describe(query="Words, names or user IDs to look for", kind="Only search one record type")
+    @app_commands.choices(kind=[
+        app_commands.Choice(name="Tickets", value="ticket"),
+        app_commands.Choice(name="Infractions", value="infract"),
+        app_commands.Choice(name="IA Cases", value="ia_case"),
+    ])
+    async def search(self, interaction: discord.Interaction, query: str, kind: Optional[app_commands.Choice[str]] = None):
+        await interaction.response.defer(ephemeral=True)
+        try:
+            results = search_index.search(query, kind=kind.value if kind else None, limit=10)
+        except Exception:
+            logger.exception("Search failed")
+            await interaction.followup.send("Search failed.", ephemeral=True)
+            return
+        if not results:
+            await interaction.followup.send(f"No matches for `{query}`.", ephemeral=True)
+            return
+
+        embed = discord.Embed(title=f"{EMOJI_INFO} Search: {query}"[:256], color=discord.Color.dark_blue())
+        for r in results:
+            value = f"{r['summary'] or 'No summary'}"[:900] + f"\nArchiveID: `{r['doc_id']}` • score {r['score']:.2f}"
+            embed.add_field(name=str(r["title"])[:256], value=value, inline=False)
+        embed.set_footer(text="Use /archive query or Expand on archive messages for full details.")
+        await interaction.followup.send(embed=embed, ephemeral=True)
+
     @app_commands.command(name="staffinfo", description="View activity and info for a staff member")
     @app_commands.check(is_bod)
     async def staffinfo(self, interaction: discord.Interaction, user: discord.Member):
@@ -2533,55 +4422,24 @@ class StaffCommands(commands.Cog):
         roles = [r.mention for r in user.roles if r.name != "@everyone"]
         roles_str = ", ".join(roles) if roles else "None"
         
-        # 2. Archive Scan (Tickets, Infractions, Promotions)
-        tickets_claimed = 0
-        infractions_received = 0
-        promotions_received = 0
-        promoted_others = 0
-        infracted_others = 0
-        
-        archive_ch = await ensure_channel(MOD_ARCHIVE_CHANNEL_ID)
-        if archive_ch:
-            try:
-                async for m in archive_ch.history(limit=None): # Scan all history for accurate stats
-                    parsed = _extract_json_from_codeblock(m.content or "")
-                    if not parsed: continue
-                    
-                    evt = parsed.get("event_type")
-                    
-                    if evt == TICKET_ARCHIVE_TYPE:
-                        if user.id in (parsed.get("claimers") or []):
-                            tickets_claimed += 1
-                            
-                    elif evt == "infract":
-                        if parsed.get("user_id") == user.id:
-                            infractions_received += 1
-                        if str(parsed.get("issued_by", "")).find(str(user.id)) != -1: # Rough check
-                            infracted_others += 1
-                            
-                    elif evt == "promote":
-                        if parsed.get("user_id") == user.id:
-                            promotions_received += 1
-                        if str(parsed.get("promoted_by", "")).find(str(user.id)) != -1:
-                            promoted_others += 1
-            except Exception:
-                pass
-                
-        # 3. Message Scan (Limited) - Scan last 1000 messages in key channels for rough activity
-        # This is expensive, so we keep it limited
-        recent_activity = "Unknown"
-        # (Optional: Could implement a more complex activity tracker in database later)
+        # 2. Archive activity (materialized profile, exact ids)
+        profile = staff_profiles.get(user.id, {})
         
         embed = discord.Embed(title=f"{EMOJI_STAFF} Staff Profile: {user.display_name}", color=discord.Color.blue())
         embed.set_thumbnail(url=user.display_avatar.url)
         embed.add_field(name="User Info", value=f"ID: {user.id}\nJoined: {join_date}\nCreated: {created_date}", inline=False)
         embed.add_field(name="Roles", value=roles_str[:1024], inline=False)
         embed.add_field(name=f"{EMOJI_MEMBER} Archive Activity", value=(
-            f"Tickets Claimed: {tickets_claimed}\n"
-            f"Infractions Received: {infractions_received}\n"
-            f"Promotions Received: {promotions_received}\n"
-            f"Infractions Issued: {infracted_others}\n"
-            f"Promotions Issued: {promoted_others}"
+            f"Tickets Claimed: {profile.get('tickets_claimed', 0)}\n"
+            f"Infractions Received: {profile.get('infractions_received', 0)}\n"
+            f"Promotions Received: {profile.get('promotions_received', 0)}\n"
+            f"Infractions Issued: {profile.get('infractions_issued', 0)}\n"
+            f"Promotions Issued: {profile.get('promotions_issued', 0)}"
+        ), inline=False)
+        embed.add_field(name="Internal Affairs", value=(
+            f"Cases Opened: {profile.get('ia_opened', 0)}\n"
+            f"Cases Claimed: {profile.get('ia_claimed', 0)}\n"
+            f"Investigated In: {profile.get('ia_investigated', 0)}"
         ), inline=False)
         
         await interaction.followup.send(embed=embed, ephemeral=True)
@@ -2694,46 +4552,13 @@ class PublicCommands(commands.Cog):
     @app_commands.command(name="ticketstats", description="View server ticket statistics")
     async def ticketstats(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=False)
-        
-        archive_ch = await ensure_channel(MOD_ARCHIVE_CHANNEL_ID)
-        if not archive_ch:
-            await interaction.followup.send("Archive channel not found. Cannot compute stats.", ephemeral=True)
-            return
-
-        total_tickets = 0
-        open_tickets = 0
-        closed_tickets = 0
-        type_counts = {"partnership": 0, "hr": 0, "general": 0, "other": 0}
-        claimers_count = {}
-        durations = []
-        
-        try:
-            async for m in archive_ch.history(limit=5000):
-                parsed = _extract_json_from_codeblock(m.content or "")
-                if parsed and parsed.get("event_type") == TICKET_ARCHIVE_TYPE:
-                    total_tickets += 1
-                    status = parsed.get("status", "closed")
-                    ttype = parsed.get("ticket_type", "other")
-                    
-                    if status == "open":
-                        open_tickets += 1
-                    else:
-                        closed_tickets += 1
-                        # Calculate duration
-                        try:
-                            created = datetime.fromisoformat(parsed.get("created_at", "").replace(" UTC", "+00:00"))
-                            closed = datetime.fromisoformat(parsed.get("closed_at", "").replace(" UTC", "+00:00"))
-                            durations.append((closed - created).total_seconds())
-                        except Exception:
-                            pass
 
-                    type_counts[ttype] = type_counts.get(ttype, 0) + 1
-                    
-                    # Count claimers
-                    for claimer_id in parsed.get("claimers", []) or []:
-                        claimers_count[claimer_id] = claimers_count.get(claimer_id, 0) + 1
-        except Exception:
-            logger.exception("Error calculating ticket stats")
+        # Materialized counters, kept current by every ticket write
+        total_tickets = ticket_aggregates["total"]
+        open_tickets = ticket_aggregates["open"]
+        closed_tickets = ticket_aggregates["closed"]
+        type_counts = ticket_aggregates["types"]
+        claimers_count = {cid: n for cid, n in ticket_aggregates["claimers"].items() if n > 0}
         
         # Sort top claimers
         sorted_claimers = sorted(claimers_count.items(), key=lambda x: x[1], reverse=True)[:5]
@@ -2744,18 +4569,37 @@ class PublicCommands(commands.Cog):
             top_claimers_text = "No data"
 
         # Avg duration
-        if durations:
-            avg_sec = sum(durations) / len(durations)
+        if ticket_aggregates["duration_n"] > 0:
+            avg_sec = ticket_aggregates["duration_sum"] / ticket_aggregates["duration_n"]
             avg_hours = round(avg_sec / 3600, 1)
             duration_text = f"{avg_hours} hours"
         else:
             duration_text = "N/A"
 
+        # Trends from the daily/weekly rollups
+        now = datetime.now(timezone.utc)
+        def _window(bucket: str, keys: List[str]) -> tuple:
+            rows = [ticket_aggregates[bucket].get(k, {}) for k in keys]
+            return sum(r.get("opened", 0) for r in rows), sum(r.get("closed", 0) for r in rows)
+        last_7 = _window("day", [(now - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(7)])
+        prev_7 = _window("day", [(now - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(7, 14)])
+        week_lines = []
+        for i in range(4):
+            key = (now - timedelta(weeks=i)).strftime("%G-W%V")
+            row = ticket_aggregates["week"].get(key, {})
+            avg = f", avg {round(row['duration_sum'] / row['closed'] / 3600, 1)}h" if row.get("closed") else ""
+            week_lines.append(f"{key}: {row.get('opened', 0)} opened / {row.get('closed', 0)} closed{avg}")
+        trends_text = (
+            f"Last 7 days: {last_7[0]} opened / {last_7[1]} closed\n"
+            f"Previous 7 days: {prev_7[0]} opened / {prev_7[1]} closed\n" + "\n".join(week_lines)
+        )
+
         embed = discord.Embed(title=f"{EMOJI_ISRP} Ticket Statistics", color=discord.Color.blue())
         embed.add_field(name="Overview", value=f"Total: {total_tickets}\nOpen: {open_tickets}\nClosed: {closed_tickets}", inline=True)
         embed.add_field(name="By Type", value=f"General: {type_counts.get('general', 0)}\nHR: {type_counts.get('hr', 0)}\nPartner: {type_counts.get('partnership', 0)}", inline=True)
         embed.add_field(name="Performance", value=f"Avg Close Time: {duration_text}", inline=True)
         embed.add_field(name="Top Claimers", value=top_claimers_text, inline=False)
+        embed.add_field(name="Trends", value=trends_text, inline=False)
         
         await interaction.followup.send(embed=embed)
 
@@ -2867,16 +4711,13 @@ class AutoResponder(commands.Cog):
                                 try:
                                     aid = entry.get("archive_msg_id")
                                     if aid:
-                                        arch_ch = await ensure_channel(MOD_ARCHIVE_CHANNEL_ID)
-                                        if arch_ch:
-                                            try:
-                                                msg = await arch_ch.fetch_message(aid)
-                                                parsed = _extract_json_from_codeblock(msg.content or "")
-                                                if parsed:
-                                                    parsed["status"] = "stopped"
-                                                    await edit_archive_message(aid, parsed)
-                                            except Exception:
-                                                pass
+                                        try:
+                                            parsed = await get_archive_record(aid)
+                                            if parsed:
+                                                parsed["status"] = "stopped"
+                                                await edit_archive_message(aid, parsed)
+                                        except Exception:
+                                            pass
                                 except Exception:
                                     pass
                                 anti_ping_map.pop(int(target_id), None)
@@ -2914,26 +4755,15 @@ class AutoResponder(commands.Cog):
 
                     details = None
                     if archive_id:
-                        archive_ch = await ensure_channel(MOD_ARCHIVE_CHANNEL_ID)
-                        if archive_ch:
-                            try:
-                                archive_msg = await archive_ch.fetch_message(archive_id)
-                                details = _extract_json_from_codeblock(archive_msg.content or "")
-                            except Exception:
-                                pass
+                        details = await get_archive_record(archive_id)
 
                     if not details:
-                        archive_ch = await ensure_channel(MOD_ARCHIVE_CHANNEL_ID)
-                        if archive_ch:
-                            try:
-                                async for m in archive_ch.history(limit=2000):
-                                    p = _extract_json_from_codeblock(m.content or "")
-                                    if p and p.get("event_type") == "ia_case" and p.get("channel_id") == ch.id:
-                                        details = p
-                                        archive_id = m.id
-                                        break
-                            except Exception:
-                                pass
+                        try:
+                            rows = archive_store.query("ia_case", channel_id=ch.id, limit=1)
+                        except Exception:
+                            rows = []
+                        if rows:
+                            archive_id, details = rows[0]
 
                     if not details:
                         details = {"event_type": "ia_case", "claimers": [], "allowed_role_ids": [], "allowed_member_ids": []}
@@ -2944,6 +4774,7 @@ class AutoResponder(commands.Cog):
                     details["claimers"] = claimers
                     details["status"] = "closed"
                     details["closed_by"] = f"{member} ({member.id})"
+                    details["closed_by_id"] = member.id
                     details["closed_at"] = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
 
                     if archive_id:
@@ -3021,32 +4852,22 @@ class AutoResponder(commands.Cog):
 
                     details = None
                     if archive_id:
-                        archive_ch = await ensure_channel(MOD_ARCHIVE_CHANNEL_ID)
-                        if archive_ch:
-                            try:
-                                archive_msg = await archive_ch.fetch_message(archive_id)
-                                details = _extract_json_from_codeblock(archive_msg.content or "")
-                            except Exception:
-                                pass
+                        details = await get_archive_record(archive_id)
 
                     if not details:
-                        archive_ch = await ensure_channel(MOD_ARCHIVE_CHANNEL_ID)
-                        if archive_ch:
-                            try:
-                                async for m in archive_ch.history(limit=2000):
-                                    p = _extract_json_from_codeblock(m.content or "")
-                                    if p and p.get("event_type") == "ia_case" and p.get("channel_id") == ch.id:
-                                        details = p
-                                        archive_id = m.id
-                                        break
-                            except Exception:
-                                pass
+                        try:
+                            rows = archive_store.query("ia_case", channel_id=ch.id, limit=1)
+                        except Exception:
+                            rows = []
+                        if rows:
+                            archive_id, details = rows[0]
 
                     if not details:
                         details = {"allowed_role_ids": [], "allowed_member_ids": []}
 
                     details["status"] = "open"
                     details["closed_by"] = None
+                    details["closed_by_id"] = None
                     details["closed_at"] = None
                     if archive_id:
                         try:
@@ -3112,32 +4933,7 @@ class AutoResponder(commands.Cog):
                 pass
             
             # Get ticket details
-            topic = message.channel.topic or ""
-            match = re.search(r"ticket_archive:(\d+)", topic)
-            archive_id = int(match.group(1)) if match else None
-            
-            details = None
-            if archive_id:
-                arch_ch = await ensure_channel(MOD_ARCHIVE_CHANNEL_ID)
-                if arch_ch:
-                    try:
-                        am = await arch_ch.fetch_message(archive_id)
-                        details = _extract_json_from_codeblock(am.content or "")
-                    except Exception:
-                        pass
-            
-            if not details:
-                arch_ch = await ensure_channel(MOD_ARCHIVE_CHANNEL_ID)
-                if arch_ch:
-                    try:
-                        async for m in arch_ch.history(limit=2000):
-                            p = _extract_json_from_codeblock(m.content or "")
-                            if p and p.get("event_type") == TICKET_ARCHIVE_TYPE and p.get("channel_id") == message.channel.id:
-                                details = p
-                                archive_id = m.id
-                                break
-                    except Exception:
-                        pass
+            archive_id, details = resolve_ticket_state(message.channel.id)
             
             if not details:
                 try:
@@ -3178,11 +4974,9 @@ class AutoResponder(commands.Cog):
                 await asyncio.sleep(24 * 60 * 60)  # 24 hours
                 
                 # Re-check ticket status
-                arch_ch = await ensure_channel(MOD_ARCHIVE_CHANNEL_ID)
-                if arch_ch and archive_id:
+                if archive_id:
                     try:
-                        am = await arch_ch.fetch_message(archive_id)
-                        updated_details = _extract_json_from_codeblock(am.content or "")
+                        _, updated_details = resolve_ticket_state(message.channel.id, archive_id)
                         if updated_details and updated_details.get("status") == "open":
                             # Still open, ping main claimer with panel
                             chan = bot.get_channel(message.channel.id)
@@ -3434,6 +5228,8 @@ async def on_guild_channel_create(channel):
 
 @bot.event
 async def on_guild_channel_delete(channel):
+    if getattr(channel, "category_id", None) == TICKET_CATEGORY_ID:
+        discard_ticket_transcript(channel.id)
     try:
         warn_ch = bot.get_channel(BOD_ALERT_CHANNEL_ID)
         if warn_ch:
@@ -3579,13 +5375,8 @@ async def on_interaction(interaction: discord.Interaction):
                     return
 
                 parsed = None
-                arch_ch = await ensure_channel(MOD_ARCHIVE_CHANNEL_ID)
-                if archive_id and arch_ch:
-                    try:
-                        am = await arch_ch.fetch_message(archive_id)
-                        parsed = _extract_json_from_codeblock(am.content or "")
-                    except Exception:
-                        parsed = None
+                if archive_id:
+                    parsed = await get_archive_record(archive_id)
 
                 if not parsed:
                     try:
@@ -3678,33 +5469,8 @@ async def on_interaction(interaction: discord.Interaction):
                 if not isinstance(chan, discord.TextChannel):
                     return
                 
-                topic = chan.topic or ""
-                match = re.search(r"ticket_archive:(\d+)", topic)
-                archive_id = int(match.group(1)) if match else None
-                
-                details = None
-                if archive_id:
-                    arch_ch = await ensure_channel(MOD_ARCHIVE_CHANNEL_ID)
-                    if arch_ch:
-                        try:
-                            am = await arch_ch.fetch_message(archive_id)
-                            details = _extract_json_from_codeblock(am.content or "")
-                        except Exception:
-                            pass
-                
-                if not details:
-                    # Fallback search
-                    arch_ch = await ensure_channel(MOD_ARCHIVE_CHANNEL_ID)
-                    if arch_ch:
-                        try:
-                            async for m in arch_ch.history(limit=2000):
-                                p = _extract_json_from_codeblock(m.content or "")
-                                if p and p.get("event_type") == TICKET_ARCHIVE_TYPE and p.get("channel_id") == chan.id:
-                                    details = p
-                                    archive_id = m.id
-                                    break
-                        except Exception:
-                            pass
+                # Resolved from the in-memory ticket cache (no REST reads)
+                archive_id, details = resolve_ticket_state(chan.id)
                 
                 if details:
                     claimers = details.get("claimers", []) or []
@@ -3715,13 +5481,16 @@ async def on_interaction(interaction: discord.Interaction):
                         claimers.append(interaction.user.id)
                         details["claimers"] = claimers
                         details["main_claimer"] = interaction.user.id
+                        # Claim locally first so a second click sees it, and answer before the archive round trip
                         if archive_id:
-                            await edit_archive_message(archive_id, details)
+                            _cache_ticket_state(archive_id, details)
                         
                         try:
                             await interaction.response.send_message(f"{interaction.user.mention} has claimed this ticket as the main claimer.", ephemeral=False)
                         except Exception:
                             pass
+                        if archive_id:
+                            await edit_archive_message(archive_id, details)
                     
                     # If already claimed, request approval from main claimer
                     elif interaction.user.id not in claimers:
@@ -3753,34 +5522,8 @@ async def on_interaction(interaction: discord.Interaction):
                 if not isinstance(chan, discord.TextChannel):
                     return
                 
-                topic = chan.topic or "" if chan else ""
-                match = re.search(r"ticket_archive:(\d+)", topic)
-                archive_id = int(match.group(1)) if match else None
-                
-                # Get ticket details
-                details = None
-                if archive_id:
-                    arch_ch = await ensure_channel(MOD_ARCHIVE_CHANNEL_ID)
-                    if arch_ch:
-                        try:
-                            am = await arch_ch.fetch_message(archive_id)
-                            details = _extract_json_from_codeblock(am.content or "")
-                        except Exception:
-                            pass
-                
-                if not details:
-                    # Fallback search
-                    arch_ch = await ensure_channel(MOD_ARCHIVE_CHANNEL_ID)
-                    if arch_ch:
-                        try:
-                            async for m in arch_ch.history(limit=2000):
-                                p = _extract_json_from_codeblock(m.content or "")
-                                if p and p.get("event_type") == TICKET_ARCHIVE_TYPE and p.get("channel_id") == chan.id:
-                                    details = p
-                                    archive_id = m.id
-                                    break
-                        except Exception:
-                            pass
+                # Get ticket details from the in-memory ticket cache (no REST reads)
+                archive_id, details = resolve_ticket_state(chan.id)
                 
                 if not details:
                     try:
@@ -3869,27 +5612,10 @@ async def on_interaction(interaction: discord.Interaction):
                         pass
                     return
 
-                arch_ch = await ensure_channel(MOD_ARCHIVE_CHANNEL_ID)
-                if not arch_ch:
-                    try:
-                        await interaction.response.send_message("Archive channel not available.", ephemeral=True)
-                    except Exception:
-                        pass
-                    return
-
-                try:
-                    archive_msg = await arch_ch.fetch_message(archive_id)
-                except Exception:
-                    try:
-                        await interaction.response.send_message("Archive message not found.", ephemeral=True)
-                    except Exception:
-                        pass
-                    return
-
-                details = _extract_json_from_codeblock(archive_msg.content or "")
+                details = await get_archive_record(archive_id)
                 if not details:
                     try:
-                        await interaction.response.send_message("Could not parse details.", ephemeral=True)
+                        await interaction.response.send_message("Archive record not found.", ephemeral=True)
                     except Exception:
                         pass
                     return
@@ -3901,6 +5627,13 @@ async def on_interaction(interaction: discord.Interaction):
                         if len(value) > 1024:
                             value = value[:1020] + "..."
                         detail_embed.add_field(name=key.replace("_", " ").title(), value=value, inline=False)
+                try:
+                    # Bounded so the interaction is still answered inside its 3s window
+                    transcript_url = await asyncio.wait_for(resolve_transcript_url(details), timeout=1.5)
+                except Exception:
+                    transcript_url = None
+                if transcript_url:
+                    detail_embed.add_field(name="Transcript", value=f"[Download]({transcript_url})", inline=False)
 
                 try:
                     await interaction.response.send_message(embed=detail_embed, ephemeral=True)
@@ -3951,6 +5684,7 @@ async def on_interaction(interaction: discord.Interaction):
                         "command": f"/{cmd_name}",
                         "params": params_str,
                         "timestamp": now_str,
+                        "interaction_id": interaction.id,
                     }
                     await send_embed_with_expand(ch, embed, details)
             except Exception:
@@ -4115,6 +5849,15 @@ async def on_ready():
 async def on_ready():
     """Bot startup and initialization"""
     logger.info(f"Bot logged in as {bot.user}")
+
+    # One pass over the archive feeds every loader below
+    try:
+        await load_archive_index()
+        await load_infraction_index(lookback=5000)
+        await load_scan_state()
+        load_sequences()
+    except Exception:
+        logger.exception("Failed to load archive index")
     
     # Initialize bot status system
     try:
@@ -4135,6 +5878,26 @@ async def on_ready():
     except Exception:
         logger.exception("Failed to start ticket inactivity loop")
 
+    try:
+        start_archive_compaction()
+    except Exception:
+        logger.exception("Failed to start archive compaction loop")
+
+    try:
+        start_schema_migration()
+    except Exception:
+        logger.exception("Failed to start archive schema migration")
+
+    try:
+        start_archive_snapshots()
+    except Exception:
+        logger.exception("Failed to start archive snapshot loop")
+
+    try:
+        prune_transcript_spools()
+    except Exception:
+        logger.exception("Failed to prune transcript spools")
+
     # Register cogs
     try:
         if not bot.get_cog("PublicCommands"):
@@ -4172,28 +5935,20 @@ async def on_ready():
     
     # Initialize staff positions embed (only if message doesn't exist)
     try:
-        # Check if message already exists in archive
-        archive_ch = await ensure_channel(MOD_ARCHIVE_CHANNEL_ID)
+        # Check if message already exists (read from the startup archive index)
         message_exists = False
-        if archive_ch:
-            try:
-                async for m in archive_ch.history(limit=1000):
-                    parsed = _extract_json_from_codeblock(m.content or "")
-                    if parsed and parsed.get("event_type") == STAFF_POSITIONS_ARCHIVE_TYPE:
-                        message_id = parsed.get("message_id")
-                        if message_id:
-                            faq_ch = await ensure_channel(FAQ_CHANNEL_ID)
-                            if faq_ch:
-                                try:
-                                    await faq_ch.fetch_message(message_id)
-                                    message_exists = True
-                                    logger.info("Staff positions embed already exists, skipping creation")
-                                except discord.NotFound:
-                                    # Message was deleted, will be recreated
-                                    pass
-                        break
-            except Exception:
-                pass
+        _, staff_record = get_archive_singleton(STAFF_POSITIONS_ARCHIVE_TYPE)
+        message_id = staff_record.get("message_id") if staff_record else None
+        if message_id:
+            faq_ch = await ensure_channel(FAQ_CHANNEL_ID)
+            if faq_ch:
+                try:
+                    await faq_ch.fetch_message(message_id)
+                    message_exists = True
+                    logger.info("Staff positions embed already exists, skipping creation")
+                except discord.NotFound:
+                    # Message was deleted, will be recreated
+                    pass
         
         # Only create/update if message doesn't exist
         if not message_exists:
@@ -4217,12 +5972,17 @@ async def on_ready():
             bot.tree.remove_command("ia", guild=guild_obj)
         except Exception:
             pass
+        try:
+            bot.tree.remove_command("archive", guild=guild_obj)
+        except Exception:
+            pass
         
         # Add command groups
         bot.tree.add_command(InfractionGroup(), guild=guild_obj)
         bot.tree.add_command(PromotionGroup(), guild=guild_obj)
         bot.tree.add_command(IAGroup(), guild=guild_obj)
-        logger.info("Command groups registered: infraction, promotion, ia")
+        bot.tree.add_command(ArchiveGroup(), guild=guild_obj)
+        logger.info("Command groups registered: infraction, promotion, ia, archive")
     except Exception:
         logger.exception("Failed to add command groups")
 
@@ -4287,12 +6047,92 @@ async def on_member_join(member):
     await asyncio.sleep(1)
     await send_welcome_message(member)
 
+def is_archive_location(channel_id: int) -> bool:
+    return channel_id == MOD_ARCHIVE_CHANNEL_ID or channel_id in archive_routes.values()
+
+# ------------------------
+# Live archive tail
+# ------------------------
+# Records written or edited by anyone else (another instance, a human) are applied to the
+# store and in-memory indexes as they arrive; on_resumed catches up on anything missed.
+def _tail_archive_message(message: discord.Message):
+    if not is_archive_location(message.channel.id):
+        return
+    if bot.user and message.author.id == bot.user.id:
+        # Our own sends are mirrored by the writer, even when the gateway echo arrives first
+        if message.id in _archive_written_hashes:
+            return
+        content_hash = hash(message.content or "")
+        provisional_id = _provisional_by_hash.get(content_hash)
+        if provisional_id is not None:
+            # A queued send landed: move it off its provisional id rather than index it twice
+            _settle_tailed_send(provisional_id, message)
+            return
+        if content_hash in _archive_sends_in_flight:
+            return
+    parsed = decode_archive_content(message.content or "")
+    if isinstance(parsed, list):
+        if parsed:
+            archive_store.upsert_journal(message.id, parsed, location=message.channel.id)
+    elif parsed:
+        _mirror_archive_record(message.id, parsed, location=message.channel.id)
+
+@bot.event
+async def on_raw_message_edit(payload: discord.RawMessageUpdateEvent):
+    """Apply archive edits made by anyone other than this bot"""
+    if not is_archive_location(payload.channel_id):
+        return
+    data = payload.data or {}
+    cached = _archive_read_cache.get(payload.message_id)
+    edited_ts = data.get("edited_timestamp")
+    if cached and cached[0] and edited_ts and discord.utils.parse_time(edited_ts) == cached[0]:
+        return
+    content = data.get("content")
+    if content is None:
+        invalidate_archive_read(payload.message_id)
+        return
+    content_hash = hash(content)
+    if content_hash in (_archive_written_hashes.get(payload.message_id), _archive_writes_in_flight.get(payload.message_id)):
+        return
+    if (
+        payload.message_id in _pending_archive_edits
+        or payload.message_id in _archive_writes_in_flight
+        or payload.message_id in _archive_outbox
+    ):
+        # A newer write of ours is on its way and will replace whatever this edit says
+        return
+    invalidate_archive_read(payload.message_id)
+    parsed = decode_archive_content(content)
+    if isinstance(parsed, list):
+        _remember_archive_content(payload.message_id, content)
+        archive_store.upsert_journal(payload.message_id, parsed, location=payload.channel_id)
+    elif parsed:
+        _remember_archive_content(payload.message_id, content)
+        _mirror_archive_record(payload.message_id, parsed, location=payload.channel_id)
+
+@bot.event
+async def on_raw_message_delete(payload: discord.RawMessageDeleteEvent):
+    if is_archive_location(payload.channel_id):
+        _forget_archive_record(payload.message_id)
+
+@bot.event
+async def on_resumed():
+    """Catch up on archive messages missed while disconnected"""
+    try:
+        await sync_archive_store(index=True)
+    except Exception:
+        logger.exception("Archive catch-up after resume failed")
+
 @bot.event
 async def on_message_delete(message):
     """Handle message deletion in monitored channels"""
     # Only monitor specific channels
     if message.channel.id not in MONITORED_CHANNELS:
         return
+    # Compaction removing stale archive records is not worth an alert
+    if message.id in _archive_self_deletes:
+        _archive_self_deletes.discard(message.id)
+        return
     
     # Small delay to allow audit log to update
     await asyncio.sleep(0.5)
@@ -4317,6 +6157,12 @@ async def on_message_delete(message):
 @bot.event
 async def on_message(message):
     """Handle messages in bot updates channel to bump status embed (sticky behavior)"""
+    try:
+        _tail_archive_message(message)
+        spool_ticket_message(message)
+    except Exception:
+        logger.exception("Archive tail failed")
+
     # Check if message is in bot updates channel
     if message.channel.id == BOT_STATUS_CHANNEL_ID:
         # Don't respond to bot messages (including our own status message)